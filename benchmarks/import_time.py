@@ -0,0 +1,67 @@
+"""
+Measures the wall time of importing ``inttools`` in fresh interpreter
+processes, compared with the time of importing all of its subpackages
+eagerly and with the time of starting a bare interpreter, e.g.
+
+    $ python benchmarks/import_time.py --repeat 20 --json import_time.json
+
+The medians (in milliseconds) are printed, and optionally written as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+STATEMENTS = {
+    'bare interpreter': 'pass',
+    'import inttools': 'import inttools',
+    'import inttools (eager)': 'from inttools import *',
+    'inttools.is_prime': 'import inttools; inttools.is_prime(2)',
+}
+
+
+def time_statement(statement, repeat):
+    """
+    Returns the wall times (in milliseconds) of running a statement in
+    ``repeat`` fresh interpreter processes, with ``inttools`` importable from
+    the source tree.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC, os.environ.get('PYTHONPATH')])))
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, '-S', '-c', statement], env=env, check=True)
+        times.append((time.perf_counter() - t) * 1000)
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the import time of inttools.')
+    parser.add_argument('--repeat', type=int, default=20, help='number of processes per statement')
+    parser.add_argument('--json', help='file to write the results to as JSON')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, statement in STATEMENTS.items():
+        times = time_statement(statement, args.repeat)
+        results[name] = {
+            'statement': statement,
+            'median_ms': statistics.median(times),
+            'min_ms': min(times),
+            'repeat': args.repeat,
+        }
+        print('{:<28} {:8.2f} ms (min {:.2f} ms)'.format(name, results[name]['median_ms'], results[name]['min_ms']))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
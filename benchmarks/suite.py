@@ -0,0 +1,300 @@
+"""
+Benchmark suite for the public inttools functions. Every benchmark is run at
+several input magnitudes, so that complexity regressions show up as changes
+in the scaling curves (the fitted log-log slopes of time against size), and
+the results can be written as JSON and compared between revisions, e.g.
+
+    $ python benchmarks/suite.py --json before.json
+    $ git checkout <other revision>
+    $ python benchmarks/suite.py --json after.json --compare before.json
+
+Use ``--filter`` to run a subset of the benchmarks (by a substring of their
+names) and ``--quick`` to run only the two smallest sizes of each. The caches
+are disabled unless ``--cached`` is given, so that repeated calls measure the
+computation rather than cache lookups. The suite only needs the standard
+library (and runs the NumPy batch benchmarks if NumPy is installed).
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+from itertools import islice
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import inttools     # noqa: E402
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name, sizes):
+    """
+    Registers a benchmark under the given name, which is run for each of the
+    given sizes. The decorated function takes a size and returns the
+    zero-argument callable to be timed (so that any setup is excluded from
+    the timing).
+    """
+    def decorator(f):
+        BENCHMARKS[name] = (f, sizes)
+        return f
+    return decorator
+
+
+@benchmark('primes', sizes=[100, 1000, 5000])
+def bench_primes(n):
+    return lambda: list(islice(inttools.primes(), n))
+
+
+@benchmark('prime_sieve', sizes=[10 ** 4, 10 ** 5, 10 ** 6])
+def bench_prime_sieve(n):
+    return lambda: inttools.prime_sieve(n)
+
+
+@benchmark('prime_factors', sizes=[10 ** 4, 10 ** 6, 10 ** 8, 10 ** 10])
+def bench_prime_factors(n):
+    # A semiprime close to n with two factors close to sqrt(n), the worst
+    # case for trial division.
+    p = q = math.isqrt(n)
+    while not inttools.is_prime(p):
+        p -= 1
+    q = p - 1
+    while not inttools.is_prime(q):
+        q -= 1
+    return lambda: list(inttools.prime_factors(p * q, multiplicities=True))
+
+
+@benchmark('divisors', sizes=[5040, 720720, 963761198400])
+def bench_divisors(n):
+    return lambda: inttools.divisors(n)
+
+
+@benchmark('sigma', sizes=[5040, 720720, 963761198400])
+def bench_sigma(n):
+    return lambda: inttools.sigma(n, 2)
+
+
+@benchmark('aliquot_table', sizes=[10 ** 4, 10 ** 5, 10 ** 6])
+def bench_aliquot_table(n):
+    # The table, and the amicable pairs and aliquot cycles below n.
+    def f():
+        t = inttools.AliquotTable(n)
+        return list(t.amicable_pairs()), list(t.cycles())
+    return f
+
+
+@benchmark('sum_of_digits', sizes=[10, 100, 1000])
+def bench_sum_of_digits(n):
+    m = 10 ** n - 1
+    return lambda: inttools.sum_of_digits(m)
+
+
+@benchmark('digit_sum', sizes=[10, 100, 1000])
+def bench_digit_sum(n):
+    m = 10 ** n - 1
+    return lambda: inttools.digit_sum(m)
+
+
+@benchmark('product_of_digits', sizes=[10, 100, 1000])
+def bench_product_of_digits(n):
+    m = 10 ** n - 1
+    return lambda: inttools.product_of_digits(m)
+
+
+@benchmark('binomial', sizes=[20, 80, 160])
+def bench_binomial(n):
+    return lambda: inttools.binomial(n, n // 2)
+
+
+@benchmark('fibonacci_n', sizes=[100, 1000, 10000])
+def bench_fibonacci_n(n):
+    return lambda: inttools.fibonacci_n(n)
+
+
+@benchmark('collatz_sequence', sizes=[10 ** 2, 10 ** 3, 10 ** 4])
+def bench_collatz_sequence(n):
+    return lambda: inttools.longest_sequence_seed(n)
+
+
+@benchmark('collatz_batch', sizes=[10 ** 3, 10 ** 4, 10 ** 5])
+def bench_collatz_batch(n):
+    return lambda: inttools.collatz_batch(range(1, n))
+
+
+@benchmark('hcount hilbert', sizes=[10 ** 4, 10 ** 6, 10 ** 8])
+def bench_hcount_hilbert(n):
+    return lambda: inttools.hcount('hilbert', range(n))
+
+
+@benchmark('hcount hilbert square', sizes=[10 ** 4, 10 ** 6, 10 ** 8])
+def bench_hcount_hilbert_square(n):
+    return lambda: inttools.hcount('hilbert square', range(n))
+
+
+@benchmark('hcount hilbert squarefree', sizes=[10 ** 4, 10 ** 6, 10 ** 8])
+def bench_hcount_hilbert_squarefree(n):
+    return lambda: inttools.hcount('hilbert squarefree', range(n))
+
+
+@benchmark('hcount squarefree hilbert', sizes=[10 ** 4, 10 ** 6, 10 ** 8])
+def bench_hcount_squarefree_hilbert(n):
+    return lambda: inttools.hcount('squarefree hilbert', range(n))
+
+
+@benchmark('gaussian_divisors', sizes=[10 ** 2, 10 ** 4, 10 ** 6])
+def bench_gaussian_divisors(n):
+    # A Gaussian integer of norm about n.
+    a = math.isqrt(n // 2)
+    g = complex(a, a + 1)
+    return lambda: list(inttools.gaussian_divisors(g))
+
+
+@benchmark('is_d_cyclic_set', sizes=[4, 8, 12])
+def bench_is_d_cyclic_set(n):
+    # A 2-cyclic chain of n 4-digit numbers, given in reverse order.
+    prefixes = [10 + 7 * i for i in range(n)]
+    chain = [100 * prefixes[i] + prefixes[(i + 1) % n] for i in range(n)]
+    return lambda: inttools.is_d_cyclic_set(chain[::-1], 2)
+
+
+@benchmark('is_polygonal_representative_set', sizes=[3, 6, 8])
+def bench_is_polygonal_representative_set(n):
+    sides = list(range(3, 3 + n))
+    int_set = [inttools.polygonal_number(s, 50) for s in sides]
+    return lambda: inttools.is_polygonal_representative_set(int_set, sides[::-1])
+
+
+@benchmark('range_mask', sizes=[10 ** 4, 10 ** 5, 10 ** 6])
+def bench_range_mask(n):
+    # The primes in the range which are Hilbert squarefree Hilbert numbers.
+    def f():
+        r = range(n)
+        return len(inttools.range_mask('prime', r) & inttools.range_mask('squarefree hilbert', r))
+    return f
+
+
+def time_callable(f, repeat):
+    """
+    Returns the best time (in seconds) per call of a zero-argument callable,
+    over ``repeat`` timing runs each of enough calls to take at least 0.2s.
+    """
+    timer = timeit.Timer(f)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def scaling_slope(times):
+    """
+    Returns the least-squares slope of log(time) against log(size), i.e. the
+    empirical exponent k in time ~ size^k, or None for fewer than two sizes.
+    """
+    points = [(math.log(size), math.log(t)) for size, t in times.items() if t > 0]
+    if len(points) < 2:
+        return None
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mx) ** 2 for x, _ in points)
+    return sum((x - mx) * (y - my) for x, y in points) / sxx if sxx else None
+
+
+def revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, repeat, quick, cached=False):
+    # Import all the subpackages, so that all their caches are registered.
+    for name in inttools.__all__:
+        getattr(inttools, name)
+    inttools.configure_caches(enabled=cached)
+
+    results = {}
+    for name in names:
+        f, sizes = BENCHMARKS[name]
+        times = {}
+        for size in (sizes[:2] if quick else sizes):
+            inttools.clear_caches()
+            try:
+                times[size] = time_callable(f(size), repeat)
+            except ImportError:
+                break
+            print('{:<36} {:>16} {:>14.3f} us'.format(name, size, times[size] * 1e6))
+        if times:
+            results[name] = {
+                'times': {str(size): t for size, t in times.items()},
+                'slope': scaling_slope(times),
+            }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the ratios of the times (new / old) for the benchmarks and sizes
+    in both sets of results, and the changes in the scaling slopes, flagging
+    the ratios above the given threshold. Returns the number of regressions.
+    """
+    regressions = 0
+    print('\n{:<36} {:>16} {:>10}'.format('benchmark', 'size', 'new / old'))
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        for size, t in result['times'].items():
+            if size in old['times'] and old['times'][size] > 0:
+                ratio = t / old['times'][size]
+                flag = '  <- regression' if ratio > threshold else ''
+                regressions += bool(flag)
+                print('{:<36} {:>16} {:>10.2f}{}'.format(name, size, ratio, flag))
+        if result['slope'] is not None and old.get('slope') is not None:
+            print('{:<36} {:>16} {:>10}'.format(
+                name, 'slope', '{:.2f} -> {:.2f}'.format(old['slope'], result['slope'])
+            ))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the public inttools functions.')
+    parser.add_argument('--filter', default='', help='only run the benchmarks whose names contain this')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timing runs per size')
+    parser.add_argument('--quick', action='store_true', help='only run the two smallest sizes')
+    parser.add_argument('--cached', action='store_true', help='keep the caches enabled')
+    parser.add_argument('--json', help='file to write the results to as JSON')
+    parser.add_argument('--compare', help='JSON results file of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=1.5, help='time ratio above which to flag a regression')
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run(names, args.repeat, args.quick, cached=args.cached)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'revision': revision(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'timestamp': time.time(),
+                'results': results,
+            }, f, indent=4)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,206 @@
-from .utils import *
-from .primes import *
-from .divisors import *
-from .arithmetic import *
-from .complex import *
-from .sequences import *
-from .special_sets import *
-from .special_numbers import *
\ No newline at end of file
+"""
+The public functions of the subpackages are available as attributes of the
+package, but the subpackages are only imported when one of their attributes
+is first used, via the module ``__getattr__``, so that ``import inttools`` is
+cheap. Optional backends such as NumPy are likewise only imported inside the
+functions which use them.
+"""
+import importlib
+import sys
+import types
+
+
+_SUBPACKAGES = (
+    'utils',
+    'primes',
+    'divisors',
+    'arithmetic',
+    'complex',
+    'sequences',
+    'special_sets',
+    'special_numbers',
+)
+
+_EXPORTS = {
+    'utils': (
+        'BoundedCache',
+        'CACHES',
+        'CacheInfo',
+        'PROBES',
+        'Probe',
+        'Profile',
+        'cache_info',
+        'cached',
+        'clear_caches',
+        'configure_caches',
+        'disable_profiling',
+        'enable_profiling',
+        'ilog',
+        'integerise',
+        'is_profiling',
+        'profile_snapshot',
+        'profiled',
+        'profiling',
+        'register_cache',
+    ),
+    'primes': (
+        'circular_primes',
+        'is_circular_prime',
+        'is_prime',
+        'prime_factors',
+        'prime_sieve',
+        'primes',
+    ),
+    'divisors': (
+        'ABUNDANCE_CLASSES',
+        'AliquotTable',
+        'aliquot_cycles',
+        'aliquot_sum_sieve',
+        'amicable_pairs',
+        'd',
+        'divisors',
+        's',
+        'sigma',
+        'sigma_k_func',
+    ),
+    'arithmetic': (
+        'Barrett',
+        'FixedBasePower',
+        'Montgomery',
+        'additive_persistence',
+        'binomial',
+        'binomial2',
+        'crt',
+        'digit_product',
+        'digit_sum',
+        'digits_',
+        'factorial',
+        'generalised_product',
+        'generalised_sum',
+        'int_concatenate',
+        'int_from_digits',
+        'int_permutations',
+        'interlace',
+        'iroot',
+        'is_pandigital',
+        'is_perfect_power',
+        'is_square',
+        'is_square_batch',
+        'isqrt',
+        'isqrt_batch',
+        'mod_inverse',
+        'mod_inverses',
+        'multinomial',
+        'multiplicative_persistence',
+        'num_digits',
+        'power_table',
+        'product_of_digits',
+        'rotation',
+        'rotations',
+        'sum_of_digits',
+    ),
+    'complex': (
+        'GaussianInteger',
+        'complex_divide',
+        'complex_format',
+        'complex_reflections',
+        'complexify',
+        'gaussian_divisors',
+        'gaussian_factors',
+        'gaussian_gcd',
+        'gaussian_primes',
+        'is_gaussian_integer',
+        'r2',
+        'r2_table',
+        'sum_of_two_squares',
+        'sum_of_two_squares_prime',
+    ),
+    'sequences': (
+        'ArithmeticProgression',
+        'COLLATZ_CACHE',
+        'GeometricProgression',
+        'arithmetic',
+        'champernowne_digits',
+        'champernowne_digits_product',
+        'champernowne_sequence',
+        'champernowne_sequence_term',
+        'collatz',
+        'collatz_batch',
+        'collatz_sequence',
+        'collatz_sequence_term',
+        'collatz_stats',
+        'fibonacci',
+        'fibonacci_n',
+        'geometric',
+        'longest_sequence_seed',
+        'pascal_triangle',
+        'ulam',
+        'ulam_sequence',
+    ),
+    'special_sets': (
+        'MASK_TYPES',
+        'RangeMask',
+        'd_cyclic_sets',
+        'is_d_cyclic_set',
+        'is_polygonal_representative_set',
+        'polygonal_representative_assignment',
+        'polygonal_representative_assignments',
+        'range_mask',
+    ),
+    'special_numbers': (
+        'HILBERT_SIEVE_SEGMENT_SIZE',
+        'hcount',
+        'hilbert_numbers',
+        'hilbert_squarefree_numbers',
+        'hilbert_squarefree_sieve',
+        'hilbert_squares',
+        'is_hilbert_number',
+        'is_hilbert_square',
+        'is_hilbert_square_batch',
+        'is_hilbert_squarefree_number',
+        'is_polygonal_number',
+        'is_polygonal_number_batch',
+        'is_squarefree_hilbert_number',
+        'n_polygonal_number_func',
+        'polygonal_digit_index',
+        'polygonal_index_range',
+        'polygonal_number',
+        'polygonal_numbers',
+        'squarefree_hilbert_numbers',
+    ),
+}
+
+_ATTRS = {name: subpackage for subpackage, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_ATTRS)
+
+
+def __getattr__(name):
+    if name in _ATTRS:
+        value = getattr(importlib.import_module('.' + _ATTRS[name], __name__), name)
+    elif name in _SUBPACKAGES:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRS) | set(_SUBPACKAGES))
+
+
+class _LazyModule(types.ModuleType):
+    """
+    The import system binds an imported subpackage as an attribute of the
+    package, which must not replace a public function of the same name, e.g.
+    ``inttools.primes`` is the ``primes`` generator.
+    """
+    def __setattr__(self, name, value):
+        if name in _ATTRS and name in _SUBPACKAGES and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyModule
@@ -0,0 +1,6 @@
+import sys
+
+from inttools.cli import main
+
+
+sys.exit(main())
@@ -1,2 +1,4 @@
 from .combinatorics import *
-from .digits import *
\ No newline at end of file
+from .digits import *
+from .modular import *
+from .roots import *
@@ -1,11 +1,29 @@
+from inttools.utils.cache import cached
+from inttools.utils.profiling import profiled
+
 from .digits import generalised_product
+from .modular import mod_inverse
 
 
+@profiled('factorial', tier='product')
+@cached('factorial', maxsize=2 ** 10, maxbytes=2 ** 26)
 def factorial(n):
+    """
+    Returns ``n!``, cached (in the 'factorial' cache).
+    """
     return generalised_product(range(1, n + 1))
 
 
-def multinomial(n, *ks):
+def _has_factor_up_to(m, k):
+    """
+    Returns whether a positive integer ``m`` has a divisor ``1 < d <= k``,
+    i.e. whether some integer in ``2, ..., k`` is not invertible modulo
+    ``m``.
+    """
+    return any(m % d == 0 for d in range(2, min(k, m) + 1))
+
+
+def multinomial(n, *ks, mod=None):
     """
     Returns the multinomial coefficient ``(n; k_1, k_2, ... k_m)``, where
     ``k_1, k_2, ..., k_m`` are non-negative integers such that
@@ -26,22 +44,54 @@ def multinomial(n, *ks):
     The argument ``ks`` can be separate non-negative integers adding up to the
     given non-negative integer ``n``, or a list, tuple or set of such
     integers prefixed by ``'*'``, e.g. ``*[1, 2, 3]``.
+
+    If a modulus ``mod`` is given the coefficient is reduced by it, and if
+    the ``k_i`` are all less than the least prime factor of the modulus it
+    is computed with residues only, as ``n!`` times the inverse of the
+    product of the ``k_i!``.
     """
-    return int(factorial(n) / generalised_product(map(factorial, ks)))
+    if mod is None:
+        return factorial(n) // generalised_product(map(factorial, ks))
+    if _has_factor_up_to(mod, max(ks, default=0)):
+        return multinomial(n, *ks) % mod
+    denominator = generalised_product((generalised_product(range(1, k + 1), mod=mod) for k in ks), mod=mod)
+    return generalised_product(range(1, n + 1), mod=mod) * mod_inverse(denominator, mod) % mod
 
 
-def binomial(n, k):
+def binomial(n, k, mod=None):
     """
     Returns the familiar binomial cofficient - the number of ways
     of choosing a set of ``k`` objects (without replacement) from a set of
-    ``n`` objects.
+    ``n`` objects (``0`` if ``k < 0`` or ``k > n``), reduced by a given
+    modulus ``mod``, e.g.
+    ::
+        (10, 3, None) -> 120
+        (10, 3, 7)    -> 1
+
+    It is computed as the quotient of the products
+    ::
+        (n - m + 1) x ... x n  and  1 x 2 x ... x m
+
+    where ``m = min(k, n - k)``, and with a modulus as the product of the
+    first and the modular inverse of the second if ``m`` is less than the
+    least prime factor of the modulus.
     """
-    return multinomial(n, k, n - k)
+    if k < 0 or k > n:
+        return 0
+    m = min(k, n - k)
+    if mod is None:
+        return generalised_product(range(n - m + 1, n + 1)) // generalised_product(range(1, m + 1))
+    if _has_factor_up_to(mod, m):
+        return binomial(n, m) % mod
+    return (
+        generalised_product(range(n - m + 1, n + 1), mod=mod) *
+        mod_inverse(generalised_product(range(1, m + 1), mod=mod), mod) % mod
+    )
 
 
-def binomial2(n, k):
+def binomial2(n, k, mod=None):
     """
-    Faster binomial method using a more direct way of calculating factorials.
+    Faster binomial method using a more direct way of calculating factorials
+    (now the same as ``binomial``).
     """
-    m = min(k, n - k)
-    return int(generalised_product(range(n - m + 1, n + 1)) / generalised_product(range(1, m + 1)))
\ No newline at end of file
+    return binomial(n, k, mod=mod)
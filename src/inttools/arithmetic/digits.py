@@ -12,6 +12,8 @@ from itertools import (
 
 from math import factorial
 
+from inttools.utils.profiling import profiled
+
 
 def num_digits(n, b):
     """
@@ -63,8 +65,14 @@ def generalised_sum(int_seq, k=1, mod=None):
         digits(123), 1, None  -> 6
         digits(123), 2, None  -> 14
         digits(123), 2, 5     -> 4
+        [], 1, None           -> 0
+
+    For a non-negative ``k`` the powers are reduced by the modulus as they
+    are computed (with ``pow``), so that they never exceed the modulus.
     """
-    r = reduce(lambda x, y: x + y, (n ** k for n in int_seq))
+    if mod is not None and k >= 0:
+        return reduce(lambda x, y: x + y, (pow(n, k, mod) for n in int_seq), 0) % mod
+    r = reduce(lambda x, y: x + y, (n ** k for n in int_seq), 0)
     if mod is None:
         return r
     return r % mod
@@ -87,13 +95,28 @@ def generalised_product(int_seq, k=1, mod=None):
         digits(123), 1, None  -> 6
         digits(123), 2, None  -> 36
         digits(123), 2, 5     -> 1
+        [], 1, None           -> 1
+
+    For a non-negative ``k`` the powers and the partial products are reduced
+    by the modulus at each step, so that they never exceed its square.
     """
-    r = reduce(lambda x, y: x * y, (n ** k for n in int_seq))
+    if mod is not None and k >= 0:
+        return reduce(lambda x, y: x * y % mod, (pow(n, k, mod) for n in int_seq), 1 % mod)
+    r = reduce(lambda x, y: x * y, (n ** k for n in int_seq), 1)
     if mod is None:
         return r
     return r % mod
 
 
+def _digits_counters(result, n, *args, **kwargs):
+    return {'digits': num_digits(n, 10)}
+
+
+def _persistence_counters(result, *args, **kwargs):
+    return {'steps': result[1]}
+
+
+@profiled('sum_of_digits', counters=_digits_counters)
 def sum_of_digits(n, k=1, mod=None):
     """
     Returns the sum of the ``k``-th powers of the digits of a given positive
@@ -106,6 +129,7 @@ def sum_of_digits(n, k=1, mod=None):
     return generalised_sum(digits_(n), k=k, mod=mod)
 
 
+@profiled('digit_sum', counters=_persistence_counters)
 def digit_sum(n, k=1, mod=None):
     """
     Returns the reduced digit sum of a given positive integer ``n``
@@ -138,6 +162,7 @@ def additive_persistence(n, k=1, mod=None):
     return digit_sum(n, k=k, mod=mod)[1]
 
 
+@profiled('product_of_digits', counters=_digits_counters)
 def product_of_digits(n, k=1, mod=None):
     """
     Returns the product of the ``k``-th powers of the digits of a given
@@ -150,6 +175,7 @@ def product_of_digits(n, k=1, mod=None):
     return generalised_product(digits_(n), k=k, mod=mod)
 
 
+@profiled('digit_product', counters=_persistence_counters)
 def digit_product(n, k=1, mod=None):
     """
     Returns the multiplicative digital root of a given positive integer ``n``
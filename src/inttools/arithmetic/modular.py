@@ -0,0 +1,305 @@
+__all__ = [
+    'Barrett',
+    'FixedBasePower',
+    'Montgomery',
+    'crt',
+    'mod_inverse',
+    'mod_inverses',
+    'power_table',
+]
+
+from math import gcd
+
+
+def mod_inverse(a, m):
+    """
+    Returns the inverse of an integer ``a`` modulo a positive integer ``m``,
+    i.e. the integer ``0 <= x < m`` such that ``ax = 1 (mod m)``, e.g.
+    ::
+        (3, 7)   -> 5
+        (-3, 7)  -> 2
+        (10, 17) -> 12
+
+    Raises a ``ValueError`` if ``a`` and ``m`` are not coprime.
+    """
+    try:
+        return pow(a, -1, m)
+    except ValueError:
+        raise ValueError('{} is not invertible modulo {}'.format(a, m)) from None
+
+
+def mod_inverses(int_seq, m):
+    """
+    Returns the list of the inverses modulo a positive integer ``m`` of a
+    sequence of integers ``int_seq``, e.g.
+    ::
+        [1, 2, 3, 4, 5, 6], 7 -> [1, 4, 5, 2, 3, 6]
+
+    Uses Montgomery's trick: the inverse of the product of all the integers
+    is computed once, and the inverses of the integers are recovered from it
+    and the prefix products, so that ``n`` inverses cost one inversion and
+    about ``3n`` modular multiplications.
+
+    Raises a ``ValueError`` if any of the integers is not coprime to ``m``.
+    """
+    values = [a % m for a in int_seq]
+    prefixes = []
+    r = 1 % m
+    for a in values:
+        prefixes.append(r)
+        r = r * a % m
+
+    if gcd(r, m) != 1:
+        a = next(a for a in values if gcd(a, m) != 1)
+        raise ValueError('{} is not invertible modulo {}'.format(a, m))
+
+    r = pow(r, -1, m)
+    inverses = [0] * len(values)
+    for i in reversed(range(len(values))):
+        inverses[i] = r * prefixes[i] % m
+        r = r * values[i] % m
+    return inverses
+
+
+def crt(residues, moduli):
+    """
+    Returns the solution of the system of congruences
+    ::
+        x = r_1 (mod m_1), x = r_2 (mod m_2), ..., x = r_k (mod m_k)
+
+    for sequences of residues ``r_i`` and positive moduli ``m_i``, by the
+    Chinese remainder theorem, as the pair ``(x, m)``, where ``m`` is the
+    least common multiple of the moduli (their product if they are pairwise
+    coprime) and ``0 <= x < m``, e.g.
+    ::
+        [2, 3, 2], [3, 5, 7] -> (23, 105)
+        [1, 3], [4, 6]       -> (9, 12)
+
+    The moduli need not be coprime, but then the system may have no
+    solution, in which case a ``ValueError`` is raised.
+    """
+    residues, moduli = list(residues), list(moduli)
+    if len(residues) != len(moduli):
+        raise ValueError('There must be one modulus per residue')
+
+    x, m = 0, 1
+    for r, n in zip(residues, moduli):
+        g = gcd(m, n)
+        if (r - x) % g:
+            raise ValueError('The congruences have no common solution')
+        # Solve x + mt = r (mod n) for t, i.e. (m / g)t = (r - x) / g (mod n / g).
+        n //= g
+        t = (r - x) // g * pow(m // g, -1, n) % n
+        x += m * t
+        m *= n
+        x %= m
+    return x, m
+
+
+class Montgomery:
+    """
+    Montgomery arithmetic modulo a fixed odd integer ``m > 1``. With
+    ``R = 2^b`` the least power of ``2`` greater than ``m``, an integer ``a``
+    is represented by ``aR mod m`` (its Montgomery form), and the product of
+    two such forms is reduced (``reduce``) using only multiplications,
+    masks and shifts by ``b`` bits, instead of a division by ``m``, e.g.
+    ::
+        >>> M = Montgomery(97)
+        >>> a, b = M.to_montgomery(20), M.to_montgomery(30)
+        >>> M.from_montgomery(M.mul(a, b))
+        >>> 18
+        >>> M.pow(5, 96)
+        >>> 1
+
+    This pays off for long chains of multiplications modulo the same large
+    modulus, e.g. exponentiations, where the conversions to and from the
+    Montgomery form are done once.
+    """
+    __slots__ = ('m', 'bits', 'mask', 'm_prime', 'r2', 'one')
+
+    def __init__(self, m):
+        if m < 3 or m % 2 == 0:
+            raise ValueError('The modulus must be an odd integer greater than 1')
+        self.m = m
+        self.bits = m.bit_length()
+        self.mask = (1 << self.bits) - 1
+        # m * m_prime = -1 (mod R), and R^2 mod m for the conversions.
+        self.m_prime = -pow(m, -1, 1 << self.bits) & self.mask
+        self.r2 = (1 << (2 * self.bits)) % m
+        self.one = (1 << self.bits) % m
+
+    def __repr__(self):
+        return 'Montgomery({})'.format(self.m)
+
+    def reduce(self, t):
+        """
+        Returns ``tR^(-1) mod m`` for an integer ``0 <= t < mR`` (REDC).
+        """
+        u = (t + ((t & self.mask) * self.m_prime & self.mask) * self.m) >> self.bits
+        return u - self.m if u >= self.m else u
+
+    def to_montgomery(self, a):
+        return self.reduce((a % self.m) * self.r2)
+
+    def from_montgomery(self, a):
+        return self.reduce(a)
+
+    def mul(self, a, b):
+        """
+        Returns the Montgomery form of the product of two integers given in
+        Montgomery form.
+        """
+        return self.reduce(a * b)
+
+    def pow(self, a, e):
+        """
+        Returns ``a^e mod m`` for an integer ``a`` and a non-negative integer
+        ``e`` (both as ordinary integers), by square-and-multiply in
+        Montgomery form.
+        """
+        if e < 0:
+            raise ValueError('The exponent must be non-negative')
+        x = self.to_montgomery(a)
+        r = self.one
+        while e:
+            if e & 1:
+                r = self.reduce(r * x)
+            x = self.reduce(x * x)
+            e >>= 1
+        return self.from_montgomery(r)
+
+
+class Barrett:
+    """
+    Barrett reduction modulo a fixed positive integer ``m``. With ``b`` the
+    bit length of ``m`` and the precomputed ``mu = floor(4^b / m)``, an
+    integer ``0 <= x < 4^b`` (e.g. the product of two residues) is reduced
+    (``reduce``) with two multiplications, shifts and at most two
+    subtractions, instead of a division by ``m``, e.g.
+    ::
+        >>> B = Barrett(97)
+        >>> B.reduce(20 * 30), B.mul(20, 30), B.pow(5, 96)
+        >>> (18, 18, 1)
+
+    Unlike Montgomery reduction it works on ordinary residues and for even
+    moduli. Integers outside the range above are reduced with ``%``.
+    """
+    __slots__ = ('m', 'bits', 'mu')
+
+    def __init__(self, m):
+        if m < 1:
+            raise ValueError('The modulus must be a positive integer')
+        self.m = m
+        self.bits = m.bit_length()
+        self.mu = (1 << (2 * self.bits)) // m
+
+    def __repr__(self):
+        return 'Barrett({})'.format(self.m)
+
+    def reduce(self, x):
+        """
+        Returns ``x mod m``.
+        """
+        if x < 0 or x >> (2 * self.bits):
+            return x % self.m
+        r = x - ((x >> (self.bits - 1)) * self.mu >> (self.bits + 1)) * self.m
+        while r >= self.m:
+            r -= self.m
+        return r
+
+    def mul(self, a, b):
+        """
+        Returns ``ab mod m`` for two residues ``0 <= a, b < m``.
+        """
+        return self.reduce(a * b)
+
+    def pow(self, a, e):
+        """
+        Returns ``a^e mod m`` for an integer ``a`` and a non-negative integer
+        ``e``, by square-and-multiply with Barrett reductions.
+        """
+        if e < 0:
+            raise ValueError('The exponent must be non-negative')
+        x = a % self.m
+        r = 1 % self.m
+        while e:
+            if e & 1:
+                r = self.reduce(r * x)
+            x = self.reduce(x * x)
+            e >>= 1
+        return r
+
+
+def power_table(base, n, m):
+    """
+    Returns the list of the first ``n`` powers ``base^0, base^1, ...,
+    base^(n - 1)`` of an integer ``base`` modulo a positive integer ``m``,
+    with one modular multiplication per power, e.g.
+    ::
+        (3, 6, 7)   -> [1, 3, 2, 6, 4, 5]
+        (10, 4, 13) -> [1, 10, 9, 12]
+    """
+    powers = []
+    r = 1 % m
+    base %= m
+    for _ in range(n):
+        powers.append(r)
+        r = r * base % m
+    return powers
+
+
+class FixedBasePower:
+    """
+    Exponentiation of a fixed integer ``base`` modulo a fixed positive
+    integer ``m``, with a table of the powers ``base^(d * 2^(wi)) mod m``
+    for the digits ``0 <= d < 2^w`` of the exponents in base ``2^w``
+    (``w`` being the window size in bits), so that ``base^e mod m`` costs
+    one modular multiplication per digit of ``e`` and no squarings, e.g.
+    ::
+        >>> f = FixedBasePower(2, 10 ** 9 + 7)
+        >>> f(10 ** 18) == pow(2, 10 ** 18, 10 ** 9 + 7)
+        >>> True
+
+    The table is extended as larger exponents are given, so it pays off for
+    many exponentiations of the same base, e.g. in primality tests or
+    discrete logarithm searches with a fixed generator.
+    """
+    __slots__ = ('base', 'm', 'window', 'table')
+
+    def __init__(self, base, m, window=4):
+        if m < 1:
+            raise ValueError('The modulus must be a positive integer')
+        self.base = base % m
+        self.m = m
+        self.window = window
+        self.table = []
+
+    def __repr__(self):
+        return 'FixedBasePower({}, {}, window={})'.format(self.base, self.m, self.window)
+
+    def _extend(self, rows):
+        m = self.m
+        b = self.base
+        while len(self.table) < rows:
+            if self.table:
+                # The base for the next digit is the previous one to the power 2^w.
+                b = self.table[-1][-1] * self.table[-1][1] % m
+            self.table.append(power_table(b, 1 << self.window, m))
+
+    def __call__(self, e):
+        """
+        Returns ``base^e mod m`` for a non-negative integer ``e``.
+        """
+        if e < 0:
+            raise ValueError('The exponent must be non-negative')
+        w = self.window
+        mask = (1 << w) - 1
+        self._extend(-(-e.bit_length() // w))
+        r = 1 % self.m
+        for row in self.table:
+            if not e:
+                break
+            if e & mask:
+                r = r * row[e & mask] % self.m
+            e >>= w
+        return r
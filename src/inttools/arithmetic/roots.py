@@ -0,0 +1,173 @@
+import math
+
+
+def _square_residues(m):
+    residues = bytearray(m)
+    for x in range(m):
+        residues[x * x % m] = 1
+    return bytes(residues)
+
+
+_SQUARES_MOD_64 = _square_residues(64)
+_SQUARES_MOD_63 = _square_residues(63)
+_SQUARES_MOD_65 = _square_residues(65)
+_SQUARES_MOD_11 = _square_residues(11)
+
+
+def isqrt(n):
+    """
+    Returns the integer square root of a non-negative integer ``n``, i.e. the
+    largest integer ``r`` such that ``r^2 <= n``, using exact integer
+    arithmetic, e.g.
+    ::
+        24        -> 4
+        25        -> 5
+        10 ** 40  -> 10 ** 20
+    """
+    if n < 0:
+        raise ValueError('The integer n must be non-negative')
+    return math.isqrt(n)
+
+
+def iroot(n, k):
+    """
+    Returns the integer ``k``-th root of a non-negative integer ``n``, i.e. the
+    largest integer ``r`` such that ``r^k <= n``, using Newton's method with
+    exact integer arithmetic, e.g.
+    ::
+        26, 3              -> 2
+        27, 3              -> 3
+        2 ** 1000 + 1, 10  -> 2 ** 100
+    """
+    if n < 0 or k < 1:
+        raise ValueError('The integer n must be non-negative and the exponent k positive')
+
+    if k == 1 or n < 2:
+        return n
+    if k == 2:
+        return math.isqrt(n)
+
+    # An initial guess which is not smaller than the root, from which the
+    # Newton iterates decrease monotonically to the root.
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def is_square(n):
+    """
+    Checks whether an integer ``n`` is a perfect square. Most non-squares are
+    rejected without computing a root by checking that ``n`` is a quadratic
+    residue modulo 64, 63, 65 and 11, e.g.
+    ::
+        144        -> True
+        145        -> False
+        10 ** 40   -> True
+    """
+    if n < 0:
+        return False
+    if not _SQUARES_MOD_64[n & 63]:
+        return False
+
+    r = n % 45045     # = 63 x 65 x 11
+    if not (_SQUARES_MOD_63[r % 63] and _SQUARES_MOD_65[r % 65] and _SQUARES_MOD_11[r % 11]):
+        return False
+
+    return math.isqrt(n) ** 2 == n
+
+
+def is_perfect_power(n):
+    """
+    Checks whether an integer ``n > 1`` is a perfect power, i.e. ``n = m^k``
+    for integers ``m`` and ``k > 1``. If so, it returns the pair ``(m, k)``
+    with the largest exponent ``k``, otherwise it returns False, e.g.
+    ::
+        64  -> (2, 6)
+        72  -> False
+        100 -> (10, 2)
+    """
+    if n < 2:
+        return False
+
+    for p in range(2, n.bit_length() + 1):
+        if any(p % q == 0 for q in range(2, math.isqrt(p) + 1)):
+            continue
+        if p == 2:
+            if not is_square(n):
+                continue
+            r = math.isqrt(n)
+        else:
+            r = iroot(n, p)
+            if r ** p != n:
+                continue
+        m = is_perfect_power(r)
+        return (m[0], m[1] * p) if m else (r, p)
+
+    return False
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def isqrt_batch(values):
+    """
+    Batch version of ``isqrt`` for an array (or any sequence) of non-negative
+    integers. For NumPy arrays of 64-bit (or smaller) integers the roots are
+    computed from float square roots with exact integer corrections, and for
+    arrays of Python ints (object arrays) element by element.
+
+    NumPy is an optional dependency: if it is not installed a list is
+    returned.
+    """
+    np = _numpy()
+    if np is None:
+        return [isqrt(int(n)) for n in values]
+
+    a = np.asarray(values)
+    if a.dtype.kind not in 'iu':
+        return np.frompyfunc(isqrt, 1, 1)(a)
+    if a.dtype.kind == 'i' and a.size and a.min() < 0:
+        raise ValueError('The integers must be non-negative')
+
+    u = a.astype(np.uint64)
+    r = np.minimum(np.sqrt(u.astype(np.float64)).astype(np.uint64), np.uint64(0xFFFFFFFF))
+    r -= (r * r > u).astype(np.uint64)
+    r += ((r < np.uint64(0xFFFFFFFF)) & ((r + np.uint64(1)) ** 2 <= u)).astype(np.uint64)
+    return r.astype(a.dtype)
+
+
+def is_square_batch(values):
+    """
+    Batch version of ``is_square`` for an array (or any sequence) of
+    integers, which returns a boolean array. The quadratic residue filters
+    are applied to the whole array first, so that roots are only computed
+    for the remaining candidates.
+
+    NumPy is an optional dependency: if it is not installed a list is
+    returned.
+    """
+    np = _numpy()
+    if np is None:
+        return [is_square(int(n)) for n in values]
+
+    a = np.asarray(values)
+    if a.dtype.kind not in 'iu':
+        return np.frompyfunc(is_square, 1, 1)(a).astype(bool)
+
+    mask = a >= 0
+    u = np.where(mask, a, 0).astype(np.uint64)
+    for m, residues in ((64, _SQUARES_MOD_64), (63, _SQUARES_MOD_63), (65, _SQUARES_MOD_65), (11, _SQUARES_MOD_11)):
+        mask &= np.frombuffer(residues, dtype=np.uint8).astype(bool)[u % np.uint64(m)]
+
+    candidates = u[mask]
+    r = isqrt_batch(candidates)
+    mask[mask] = r * r == candidates
+    return mask
@@ -0,0 +1,381 @@
+"""
+Command-line interface for streaming integers through the inttools
+functions, e.g.
+
+    $ seq 1 1000000 | python -m inttools factor --jobs 8 > factors.txt
+    $ python -m inttools collatz seeds.txt --format ndjson
+
+The input is read as newline-delimited integers, from the given files or
+stdin, in large blocks, and is processed in chunks of lines, optionally by
+a pool of worker processes. The outputs are written in the order of the
+inputs, one line per input, either as text (``<n>: <result>``) or as JSON
+objects (NDJSON). Blank lines are skipped, and lines which are not integers
+(or are outside the domain of the command) produce error lines, in which
+case the exit status is 1.
+"""
+import argparse
+import json
+import os
+import sys
+
+from collections import deque
+from functools import partial
+
+from inttools.arithmetic import (
+    digit_sum,
+    sum_of_digits,
+)
+from inttools.divisors import (
+    divisors,
+    sigma,
+)
+from inttools.primes import (
+    is_prime,
+    prime_factors,
+    prime_sieve,
+)
+from inttools.sequences import (
+    collatz_batch,
+    collatz_stats,
+)
+from inttools.special_numbers import (
+    is_hilbert_number,
+    is_hilbert_square,
+    is_hilbert_squarefree_number,
+    is_squarefree_hilbert_number,
+)
+from inttools.utils.cache import configure_caches
+
+
+BLOCK_SIZE = 1 << 20
+
+CHUNK_SIZE = 1 << 14
+
+# The largest chunk maximum for which ``isprime`` uses a sieve, and the
+# largest seed for which ``collatz`` uses the NumPy batch engine.
+ISPRIME_SIEVE_LIMIT = 1 << 24
+
+COLLATZ_BATCH_LIMIT = 1 << 62
+
+
+def _positive(n):
+    if n < 1:
+        raise ValueError('{} is not a positive integer'.format(n))
+    return n
+
+
+def _non_negative(n):
+    if n < 0:
+        raise ValueError('{} is not a non-negative integer'.format(n))
+    return n
+
+
+def _factor(ns, options):
+    for n in ns:
+        yield {'n': n, 'factors': [[p, e] for p, e in prime_factors(_positive(n), multiplicities=True)]}
+
+
+def _isprime(ns, options):
+    # The sieve bound is rounded up to a power of 2, so that the (cached)
+    # sieves are reused between chunks.
+    ubound = 1 << max(ns, default=0).bit_length()
+    if 1 < ubound <= ISPRIME_SIEVE_LIMIT and len(ns) > 1:
+        sieve = prime_sieve(ubound)
+        for n in ns:
+            yield {'n': n, 'prime': n > 1 and bool(sieve[n])}
+    else:
+        for n in ns:
+            yield {'n': n, 'prime': is_prime(n)}
+
+
+def _divisors(ns, options):
+    for n in ns:
+        yield {'n': n, 'divisors': divisors(_positive(n))}
+
+
+def _sigma(ns, options):
+    for n in ns:
+        yield {'n': n, 'sigma': sigma(_positive(n), options.k)}
+
+
+def _digitsum(ns, options):
+    for n in ns:
+        if options.root:
+            root, persistence, _ = digit_sum(_non_negative(n), k=options.k)
+            yield {'n': n, 'digital_root': root, 'persistence': persistence}
+        else:
+            yield {'n': n, 'digit_sum': sum_of_digits(_non_negative(n), k=options.k)}
+
+
+def _collatz(ns, options):
+    seeds = [n for n in ns if 1 <= n < COLLATZ_BATCH_LIMIT]
+    stats = {}
+    if len(seeds) > 1:
+        stats = dict(zip(seeds, zip(*(map(int, t) for t in collatz_batch(seeds)))))
+    for n in ns:
+        stopping_time, total_stopping_time, peak = stats.get(n) or collatz_stats(n)
+        yield {'n': n, 'stopping_time': stopping_time, 'total_stopping_time': total_stopping_time, 'peak': peak}
+
+
+_HILBERT_TYPES = (
+    ('hilbert', is_hilbert_number),
+    ('hilbert square', is_hilbert_square),
+    ('hilbert squarefree', is_hilbert_squarefree_number),
+    ('squarefree hilbert', is_squarefree_hilbert_number),
+)
+
+
+def _hilbert(ns, options):
+    for n in ns:
+        record = {'n': n}
+        record.update((name.replace(' ', '_'), bool(f(n))) for name, f in _HILBERT_TYPES)
+        yield record
+
+
+def _format_factor(record):
+    # The prime factors with repetitions, as printed by coreutils ``factor``.
+    return ' '.join(str(p) for p, e in record['factors'] for _ in range(e))
+
+
+def _format_digitsum(record):
+    if 'digit_sum' in record:
+        return str(record['digit_sum'])
+    return '{digital_root} {persistence}'.format_map(record)
+
+
+def _format_hilbert(record):
+    return ', '.join(name for name, _ in _HILBERT_TYPES if record[name.replace(' ', '_')])
+
+
+# The commands, as pairs of a function which maps a list of integers (and
+# the command-line options) to an iterable of result records, and a function
+# which formats a record as text.
+COMMANDS = {
+    'factor': (_factor, _format_factor),
+    'isprime': (_isprime, lambda record: 'true' if record['prime'] else 'false'),
+    'divisors': (_divisors, lambda record: ' '.join(map(str, record['divisors']))),
+    'sigma': (_sigma, '{sigma}'.format_map),
+    'digitsum': (_digitsum, _format_digitsum),
+    'collatz': (_collatz, '{stopping_time} {total_stopping_time} {peak}'.format_map),
+    'hilbert': (_hilbert, _format_hilbert),
+}
+
+
+def _error_line(line, error, ndjson):
+    text = line.decode('utf-8', 'replace')
+    if ndjson:
+        return json.dumps({'input': text, 'error': str(error)})
+    return '{}: error: {}'.format(text, error)
+
+
+def process_chunk(command, options, lines):
+    """
+    Processes a chunk of input lines (as bytes, without the newlines) with
+    the given command, and returns a pair of the encoded output lines and the
+    number of errors. Each line is parsed and computed separately, so that an
+    invalid line only produces an error line in its place.
+    """
+    compute, formatter = COMMANDS[command]
+    ndjson = options.format == 'ndjson'
+    if options.no_cache:
+        configure_caches(enabled=False)
+
+    ns = []
+    for line in lines:
+        try:
+            ns.append(int(line))
+        except ValueError as e:
+            ns.append(e)
+
+    def record_line(record):
+        if ndjson:
+            return json.dumps(record)
+        return '{}: {}'.format(record['n'], formatter(record))
+
+    out = []
+    errors = 0
+    valid = [n for n in ns if not isinstance(n, Exception)]
+    try:
+        results = iter(list(compute(valid, options)))
+    except Exception:
+        # Fall back to computing the lines one by one, to find the errors.
+        results = None
+
+    for line, n in zip(lines, ns):
+        if isinstance(n, Exception):
+            out.append(_error_line(line, 'invalid integer', ndjson))
+            errors += 1
+            continue
+        try:
+            record = next(results) if results is not None else next(iter(compute([n], options)))
+        except Exception as e:
+            out.append(_error_line(line, e, ndjson))
+            errors += 1
+            continue
+        out.append(record_line(record))
+
+    return ('\n'.join(out) + '\n' if out else '').encode(), errors
+
+
+def read_chunks(streams, chunk_size=CHUNK_SIZE, block_size=BLOCK_SIZE):
+    """
+    Generates lists of up to ``chunk_size`` non-blank lines (as stripped
+    bytes) from the given binary streams, in order, which are read in blocks
+    of ``block_size`` bytes.
+    """
+    chunk = []
+    for stream in streams:
+        rest = b''
+        while True:
+            block = stream.read(block_size)
+            if not block:
+                break
+            lines = (rest + block).split(b'\n')
+            rest = lines.pop()
+            for line in lines:
+                line = line.strip()
+                if line:
+                    chunk.append(line)
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+        rest = rest.strip()
+        if rest:
+            chunk.append(rest)
+    if chunk:
+        yield chunk
+
+
+def _open_inputs(paths):
+    for path in paths or ['-']:
+        if path == '-':
+            yield sys.stdin.buffer
+        else:
+            with open(path, 'rb') as f:
+                yield f
+
+
+def run(command, options, chunks, out, jobs=1):
+    """
+    Processes the chunks of input lines with the given command, and writes
+    the outputs to the binary stream ``out`` in order. With more than one
+    job the chunks are processed by a pool of worker processes, with at most
+    two chunks per worker in flight, so that the memory use is bounded.
+    Returns the number of errors.
+    """
+    f = partial(process_chunk, command, options)
+    errors = 0
+
+    if jobs == 1:
+        for chunk in chunks:
+            data, k = f(chunk)
+            out.write(data)
+            errors += k
+        return errors
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(f, chunk))
+                while len(pending) >= 2 * jobs or (pending and pending[0].done()):
+                    data, k = pending.popleft().result()
+                    out.write(data)
+                    errors += k
+            while pending:
+                data, k = pending.popleft().result()
+                out.write(data)
+                errors += k
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    return errors
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m inttools',
+        description='Stream newline-delimited integers through inttools functions.'
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('files', nargs='*', help="input files (default: stdin, or '-')")
+    common.add_argument('--format', choices=('text', 'ndjson'), default='text', help='output format')
+    common.add_argument('-o', '--output', help='output file (default: stdout)')
+    common.add_argument(
+        '-j', '--jobs', type=int, default=1, help='number of worker processes (0 for the number of CPUs)'
+    )
+    common.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='number of lines per chunk')
+    common.add_argument(
+        '--no-cache', action='store_true', help='disable the caches (e.g. for inputs without repetitions)'
+    )
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('factor', parents=[common], help='prime factorisations')
+    subparsers.add_parser('isprime', parents=[common], help='primality')
+    subparsers.add_parser('divisors', parents=[common], help='divisors')
+    sigma_parser = subparsers.add_parser('sigma', parents=[common], help='sums of powers of divisors')
+    sigma_parser.add_argument('-k', type=int, default=1, help='power of the divisors (default: 1)')
+    digitsum_parser = subparsers.add_parser('digitsum', parents=[common], help='sums of powers of digits')
+    digitsum_parser.add_argument('-k', type=int, default=1, help='power of the digits (default: 1)')
+    digitsum_parser.add_argument(
+        '--root', action='store_true', help='the digital roots and additive persistences instead'
+    )
+    subparsers.add_parser(
+        'collatz', parents=[common], help='Collatz stopping times, total stopping times and peaks'
+    )
+    subparsers.add_parser('hilbert', parents=[common], help='Hilbert number types')
+
+    serve_parser = subparsers.add_parser('serve', help='run the query server (see inttools.server)')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='TCP host (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=None, help='TCP port (default: 7391)')
+    serve_parser.add_argument('--unix', metavar='PATH', help='Unix socket path, instead of TCP')
+    serve_parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='number of worker processes (default: the number of CPUs, 0 for a thread in the server process)'
+    )
+    serve_parser.add_argument(
+        '--timeout', type=float, default=None, help='seconds after which a query fails (default: 30, 0 for none)'
+    )
+    return parser
+
+
+def main(argv=None):
+    options = _parser().parse_args(argv)
+    if options.command == 'serve':
+        from inttools.server import (
+            DEFAULT_PORT,
+            QUERY_TIMEOUT,
+            serve,
+        )
+        timeout = QUERY_TIMEOUT if options.timeout is None else options.timeout or None
+        serve(
+            host=options.host, port=options.port or DEFAULT_PORT, path=options.unix, jobs=options.jobs,
+            timeout=timeout
+        )
+        return 0
+
+    jobs = options.jobs or os.cpu_count() or 1
+    if jobs < 1 or options.chunk_size < 1:
+        raise SystemExit('The number of jobs and the chunk size must be positive')
+
+    out = open(options.output, 'wb') if options.output else sys.stdout.buffer
+    try:
+        chunks = read_chunks(_open_inputs(options.files), chunk_size=options.chunk_size)
+        errors = run(options.command, options, chunks, out, jobs=jobs)
+        out.flush()
+    except BrokenPipeError:
+        # The reader of the output has gone away (e.g. ``| head``).
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if options.output:
+            out.close()
+
+    return 1 if errors else 0
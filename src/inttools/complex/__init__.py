@@ -1 +1,2 @@
-from .complex import *
\ No newline at end of file
+from .complex import *
+from .gaussian import *
\ No newline at end of file
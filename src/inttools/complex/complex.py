@@ -1,8 +1,12 @@
-import math
-
 from itertools import product
 
 from inttools.utils import integerise
+from inttools.utils.profiling import profiled
+
+from .gaussian import (
+    GaussianInteger,
+    gaussian_factors,
+)
 
 def complexify(r):
     """
@@ -52,6 +56,7 @@ def complex_reflections(z):
         yield complex(0, b)
         
 
+@profiled('complex_divide')
 def complex_divide(z1, z2):
     """
         Divides complex numbers using explicit formulae for the real and
@@ -70,27 +75,35 @@ def is_gaussian_integer(z):
         Checks whether a given real or complex number is a Gaussian integer,
         i.e. a complex number g = a + bi such that a and b are integers.
     """
-    if type(z) == int:
+    if type(z) == int or isinstance(z, GaussianInteger):
         return True
     return z.real.is_integer() and z.imag.is_integer()
 
 
+@profiled('gaussian_divisors', counters=lambda k, g: {'divisors': k})
 def gaussian_divisors(g):
     """
         Generates a sequence of Gaussian divisors of a rational or Gaussian
         integer g, i.e. a Gaussian integer d such that g / d is also a Gaussian
-        integer.
+        integer, including the associates of each divisor, e.g.
+
+            2 -> 1, i, -1, -i, 1 + i, -1 + i, -1 - i, 1 - i, 2i, -2, -2i, 2
+
+        The divisors are generated as ``GaussianInteger`` values (which
+        compare equal to the corresponding complex numbers) from the
+        factorisation of g, in time proportional to the number of divisors.
     """
     if not is_gaussian_integer(g):
         return
 
-    g = complex_format(g)
-    ubound = math.ceil(math.sqrt(abs(g))) if g.real and g.imag else int(g.real) if g.real else int(g.imag)
-
-    for a, b in product(range(ubound + 1), range(ubound + 1)):
-        if a or b:
-            d = complex(a, b)
-            if is_gaussian_integer(complex_divide(g, d)):
-                for f in complex_reflections(d):
-                    yield f
+    g = GaussianInteger.from_number(g)
+    if not g:
+        return
 
+    _, factors = gaussian_factors(g)
+    powers = [[p ** k for k in range(e + 1)] for p, e in factors]
+    for ds in product(*powers):
+        d = GaussianInteger(1, 0)
+        for q in ds:
+            d *= q
+        yield from d.associates()
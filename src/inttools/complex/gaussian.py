@@ -0,0 +1,435 @@
+import sys
+
+from itertools import product
+
+from inttools.arithmetic import isqrt
+from inttools.primes import (
+    prime_factors,
+    prime_sieve,
+)
+from inttools.utils.profiling import profiled
+
+
+def _integral(x):
+    """
+        Returns the int equal to an integer (or e.g. an integral float), and
+        raises a ``ValueError`` for a non-integral number, rather than
+        truncating it.
+    """
+    if type(x) is int:
+        return x
+    n = int(x)
+    if n != x:
+        raise ValueError('{!r} is not an integer'.format(x))
+    return n
+
+
+class GaussianInteger:
+    """
+        A Gaussian integer g = a + bi, with integer real and imaginary parts a
+        and b, and exact (int-only) arithmetic. Division is Euclidean, with
+        the quotient rounded to the nearest Gaussian integer, so that the
+        norm of the remainder is at most half the norm of the divisor, e.g.
+
+            >>> divmod(GaussianInteger(7, 3), GaussianInteger(2, 1))
+            >>> (GaussianInteger(3, 0), GaussianInteger(1, 0))
+
+        Gaussian integers compare equal to (and hash like) the equal ints and
+        Python complex numbers.
+    """
+    __slots__ = ('real', 'imag')
+
+    def __init__(self, real=0, imag=0):
+        self.real = _integral(real)
+        self.imag = _integral(imag)
+
+    @classmethod
+    def from_number(cls, z):
+        """
+            Converts an int, an integral float or a complex number with
+            integral real and imaginary parts into a Gaussian integer.
+        """
+        if isinstance(z, cls):
+            return z
+        if isinstance(z, int):
+            return cls(z, 0)
+        if isinstance(z, (float, complex)):
+            z = complex(z)
+            if z.real.is_integer() and z.imag.is_integer():
+                return cls(int(z.real), int(z.imag))
+        raise ValueError('{} is not a Gaussian integer'.format(z))
+
+    @classmethod
+    def _coerce(cls, z):
+        try:
+            return cls.from_number(z)
+        except ValueError:
+            return None
+
+    def __repr__(self):
+        return 'GaussianInteger({}, {})'.format(self.real, self.imag)
+
+    def __complex__(self):
+        return complex(self.real, self.imag)
+
+    def __bool__(self):
+        return bool(self.real or self.imag)
+
+    def __eq__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return self.real == other.real and self.imag == other.imag
+
+    def __hash__(self):
+        # The hash of the equal complex number, computed exactly.
+        h = (hash(self.real) + sys.hash_info.imag * hash(self.imag)) % (1 << sys.hash_info.width)
+        if h >= 1 << (sys.hash_info.width - 1):
+            h -= 1 << sys.hash_info.width
+        return -2 if h == -1 else h
+
+    def __neg__(self):
+        return GaussianInteger(-self.real, -self.imag)
+
+    def __pos__(self):
+        return self
+
+    def __add__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return GaussianInteger(self.real + other.real, self.imag + other.imag)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return GaussianInteger(self.real - other.real, self.imag - other.imag)
+
+    def __rsub__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return other - self
+
+    def __mul__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        a, b, c, d = self.real, self.imag, other.real, other.imag
+        return GaussianInteger(a * c - b * d, a * d + b * c)
+
+    __rmul__ = __mul__
+
+    def __pow__(self, k):
+        if not isinstance(k, int) or k < 0:
+            return NotImplemented
+        result = GaussianInteger(1, 0)
+        z = self
+        while k:
+            if k & 1:
+                result *= z
+            z *= z
+            k >>= 1
+        return result
+
+    def __divmod__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        n = other.norm()
+        if n == 0:
+            raise ZeroDivisionError('Gaussian integer division by zero')
+        p = self * other.conjugate()
+        q = GaussianInteger((2 * p.real + n) // (2 * n), (2 * p.imag + n) // (2 * n))
+        return q, self - q * other
+
+    def __rdivmod__(self, other):
+        other = self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return divmod(other, self)
+
+    def __floordiv__(self, other):
+        return divmod(self, other)[0]
+
+    def __rfloordiv__(self, other):
+        return divmod(other, self)[0]
+
+    def __mod__(self, other):
+        return divmod(self, other)[1]
+
+    def __rmod__(self, other):
+        return divmod(other, self)[1]
+
+    def conjugate(self):
+        return GaussianInteger(self.real, -self.imag)
+
+    def norm(self):
+        """
+            The norm N(a + bi) = a^2 + b^2, which is multiplicative.
+        """
+        return self.real * self.real + self.imag * self.imag
+
+    def associates(self):
+        """
+            Generates the four associates g, ig, -g, -ig of the Gaussian
+            integer g.
+        """
+        a, b = self.real, self.imag
+        yield self
+        yield GaussianInteger(-b, a)
+        yield GaussianInteger(-a, -b)
+        yield GaussianInteger(b, -a)
+
+    def normalised(self):
+        """
+            Returns the associate in the first quadrant, i.e. with a positive
+            real part and a non-negative imaginary part (or 0).
+        """
+        for g in self.associates():
+            if g.real > 0 and g.imag >= 0:
+                return g
+        return self
+
+
+def gaussian_gcd(z, w):
+    """
+        Returns the greatest common divisor of two Gaussian integers (or
+        ints, or complex numbers with integral parts), normalised to the
+        first quadrant, using the Euclidean algorithm, e.g.
+
+            (5, 3 + i) -> 2 - i normalised = 1 + 2i
+    """
+    z, w = GaussianInteger.from_number(z), GaussianInteger.from_number(w)
+    while w:
+        z, w = w, z % w
+    return z.normalised()
+
+
+def sum_of_two_squares_prime(p):
+    """
+        Returns the pair (a, b), with a > b > 0, such that a^2 + b^2 = p for a
+        prime p = 1 mod 4, using the Hermite-Serret (Cornacchia) algorithm:
+        for a square root x of -1 mod p, the first two remainders below
+        sqrt(p) in the Euclidean algorithm on p and x are a and b, e.g.
+
+            13 -> (3, 2)
+
+        For p = 2 this is (1, 1), and for other integers p a ``ValueError``
+        is raised.
+    """
+    if p == 2:
+        return 1, 1
+
+    if p < 5 or p % 4 != 1:
+        raise ValueError('{} is not a prime which is 1 mod 4'.format(p))
+
+    c = 2
+    while pow(c, (p - 1) // 2, p) != p - 1:
+        c += 1
+    x = pow(c, (p - 1) // 4, p)
+
+    a, b = p, x
+    while b * b > p:
+        a, b = b, a % b
+    return b, a % b
+
+
+@profiled('gaussian_factors')
+def gaussian_factors(g):
+    """
+        Returns the factorisation of a non-zero Gaussian integer g as a pair
+        of a unit u (one of 1, i, -1, -i) and a list of pairs of distinct
+        Gaussian primes p (normalised to the first quadrant) and their
+        multiplicities e, such that g = u x p_1^e_1 x ... x p_k^e_k, e.g.
+
+            3 + 4i -> (GaussianInteger(1, 0), [(GaussianInteger(2, 1), 2)])
+
+        The primes are obtained from the rational prime factorisation of the
+        norm N(g): 2 = -i(1 + i)^2 ramifies, the primes p = 3 mod 4 are inert,
+        and the primes p = 1 mod 4 split as p = (a + bi)(a - bi), with a and b
+        found by ``sum_of_two_squares_prime``.
+    """
+    g = GaussianInteger.from_number(g)
+    if not g:
+        raise ValueError('0 has no factorisation')
+
+    factors = []
+    for p, e in prime_factors(g.norm(), multiplicities=True):
+        if p == 2:
+            factors.append((GaussianInteger(1, 1), e))
+        elif p % 4 == 3:
+            factors.append((GaussianInteger(p, 0), e // 2))
+        else:
+            a, b = sum_of_two_squares_prime(p)
+            pi = GaussianInteger(a, b)
+            k = 0
+            while k < e:
+                q, r = divmod(g, pi)
+                if r:
+                    break
+                g = q
+                k += 1
+            if k:
+                factors.append((pi, k))
+            if e - k:
+                factors.append((GaussianInteger(b, a), e - k))
+                g //= GaussianInteger(b, a) ** (e - k)
+            continue
+        g //= factors[-1][0] ** factors[-1][1]
+
+    factors.sort(key=lambda f: (f[0].norm(), f[0].real))
+    return g, factors
+
+
+
+def gaussian_primes(norm_bound, associates=False):
+    """
+        Generates the Gaussian primes with norm at most the given bound, in
+        order of norm, normalised to the first quadrant (or with all four
+        associates of each, if ``associates`` is True), e.g.
+
+            20 -> 1 + i, 2 + i, 1 + 2i, 3, 3 + 2i, 2 + 3i, 4 + i, 1 + 4i
+
+        The primes are read off a sieve of the rational primes up to the
+        bound: 1 + i (of norm 2), the two primes a + bi and b + ai of norm p
+        for each prime p = 1 mod 4, and the inert primes p = 3 mod 4 (of
+        norm p^2).
+    """
+    sieve = prime_sieve(norm_bound + 1)
+    inert = (q for q in range(3, isqrt(norm_bound) + 1, 4) if sieve[q])
+    q = next(inert, None)
+
+    def emit(g):
+        return g.associates() if associates else (g,)
+
+    for p in range(2, norm_bound + 1):
+        if not sieve[p]:
+            continue
+        while q is not None and q * q <= p:
+            yield from emit(GaussianInteger(q, 0))
+            q = next(inert, None)
+        if p == 2:
+            yield from emit(GaussianInteger(1, 1))
+        elif p % 4 == 1:
+            a, b = sum_of_two_squares_prime(p)
+            yield from emit(GaussianInteger(a, b))
+            yield from emit(GaussianInteger(b, a))
+
+    while q is not None:
+        yield from emit(GaussianInteger(q, 0))
+        q = next(inert, None)
+
+
+def r2(n):
+    """
+        Returns the number of representations of a non-negative integer n as
+        a sum of two squares n = a^2 + b^2, counting signs and order, e.g.
+
+            25 -> 12    (as (0, +-5), (+-5, 0), (+-3, +-4), (+-4, +-3))
+
+        From the prime factorisation of n, this is 0 if a prime p = 3 mod 4
+        occurs with an odd multiplicity, and otherwise 4 times the product of
+        e + 1 over the primes p = 1 mod 4 of multiplicity e. For a negative
+        n this is 0.
+    """
+    if n < 0:
+        return 0
+
+    if n == 0:
+        return 1
+
+    r = 4
+    for p, e in prime_factors(n, multiplicities=True):
+        if p % 4 == 1:
+            r *= e + 1
+        elif p % 4 == 3 and e % 2:
+            return 0
+    return r
+
+
+def r2_table(ubound):
+    """
+        Returns the list of the values of ``r2`` for the integers 0, 1, ...,
+        ubound - 1, computed from the factorisations of all the integers in
+        the range, which are obtained from a sieve of their smallest prime
+        factors.
+    """
+    if ubound < 1:
+        return []
+
+    spf = list(range(ubound))
+    small = prime_sieve(isqrt(max(ubound - 1, 0)) + 1)
+    for p in reversed(range(len(small))):
+        if small[p]:
+            spf[p * p::p] = [p] * len(range(p * p, ubound, p))
+
+    # f(n) = r2(n) / 4 is multiplicative, so f(n) = f(m) f(p^e), where p is
+    # the smallest prime factor of n, e its multiplicity and m = n / p^e.
+    f = [1] * ubound
+    exponent = [0] * ubound
+    rest = [1] * ubound
+    for n in range(2, ubound):
+        p = spf[n]
+        m = n // p
+        if spf[m] == p and m > 1:
+            e = exponent[n] = exponent[m] + 1
+            rest[n] = rest[m]
+        else:
+            e = exponent[n] = 1
+            rest[n] = m
+        if p % 4 == 1:
+            f[n] = f[rest[n]] * (e + 1)
+        elif p % 4 == 3 and e % 2:
+            f[n] = 0
+        else:
+            f[n] = f[rest[n]]
+
+    table = [4 * x for x in f]
+    table[0] = 1
+    return table
+
+
+def sum_of_two_squares(n):
+    """
+        Returns the sorted list of all the representations (a, b) of a
+        non-negative integer n as a sum of two squares n = a^2 + b^2,
+        including signs and order, e.g.
+
+            25 -> (-5, 0), (-4, -3), (-4, 3), (-3, -4), (-3, 4), (0, -5),
+                  (0, 5), (3, -4), (3, 4), (4, -3), (4, 3), (5, 0)
+
+        These are the Gaussian integers of norm n, which are generated from
+        the prime factorisation of n rather than by scanning a grid. For a
+        negative n there are none.
+    """
+    if n < 0:
+        return []
+
+    if n == 0:
+        return [(0, 0)]
+
+    choices = []
+    for p, e in prime_factors(n, multiplicities=True):
+        if p == 2:
+            choices.append([GaussianInteger(1, 1) ** e])
+        elif p % 4 == 3:
+            if e % 2:
+                return []
+            choices.append([GaussianInteger(p, 0) ** (e // 2)])
+        else:
+            a, b = sum_of_two_squares_prime(p)
+            pi, pi_bar = GaussianInteger(a, b), GaussianInteger(a, -b)
+            choices.append([pi ** k * pi_bar ** (e - k) for k in range(e + 1)])
+
+    reps = []
+    for zs in product(*choices):
+        z = GaussianInteger(1, 0)
+        for w in zs:
+            z *= w
+        reps.extend((u.real, u.imag) for u in z.associates())
+
+    return sorted(reps)
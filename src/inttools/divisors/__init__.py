@@ -1 +1,2 @@
-from .divisors import *
\ No newline at end of file
+from .divisors import *
+from .aliquot import *
@@ -0,0 +1,286 @@
+__all__ = [
+    'ABUNDANCE_CLASSES',
+    'AliquotTable',
+    'aliquot_cycles',
+    'aliquot_sum_sieve',
+    'amicable_pairs',
+]
+
+import heapq
+
+from array import array
+from math import isqrt
+from operator import add
+
+from inttools.utils.profiling import profiled
+
+
+# The abundance classes of a positive integer n, indexed by the sign of
+# s(n) - n plus one.
+ABUNDANCE_CLASSES = ('deficient', 'perfect', 'abundant')
+
+# The number of table entries processed at a time by the NumPy passes, to
+# bound the sizes of their temporary arrays.
+ALIQUOT_BLOCK_SIZE = 1 << 16
+
+
+def _aliquot_sum_sieve_tier(sums, ubound):
+    return 'python' if isinstance(sums, array) else 'numpy'
+
+
+@profiled('aliquot_sum_sieve', tier=_aliquot_sum_sieve_tier)
+def aliquot_sum_sieve(ubound):
+    """
+    Returns a compact array of the aliquot sums s(n) (the sums of the proper
+    divisors) of the integers ``0 <= n < ubound``, with s(0) = s(1) = 0, e.g.
+    ::
+        13 -> 0, 0, 1, 1, 3, 1, 6, 1, 7, 4, 8, 1, 16
+
+    Each divisor ``d <= sqrt(n)`` of ``n`` is paired with the cofactor
+    ``n / d``, so the table is built by adding ``d + m`` to the entries of
+    the multiples ``dm`` (for ``m >= d``) of each ``d < sqrt(ubound)``, one
+    slice per ``d``, and then subtracting ``n`` from the entry of ``n``. This
+    takes O(N log N) additions, but only O(sqrt(N)) slice operations, for
+    ``ubound = N``, instead of a factorisation per integer.
+
+    The array is a NumPy int64 array, or if NumPy is not installed an
+    ``array.array`` of type 'q'.
+    """
+    ubound = max(ubound, 0)
+    try:
+        import numpy as np
+    except ImportError:
+        sums = array('q', bytes(8 * ubound))
+        for d in range(1, isqrt(max(ubound - 1, 0)) + 1):
+            sums[d * d::d] = array('q', map(add, sums[d * d::d], range(2 * d, d + (ubound - 1) // d + 1)))
+            sums[d * d] -= d
+        return array('q', map(int.__sub__, sums, range(ubound)))
+
+    ns = np.arange(ubound, dtype=np.int64)
+    sums = np.zeros(ubound, dtype=np.int64)
+    for d in range(1, isqrt(max(ubound - 1, 0)) + 1):
+        sums[d * d::d] += ns[d:(ubound - 1) // d + 1] + d
+        sums[d * d] -= d
+    sums -= ns
+    return sums
+
+
+class AliquotTable:
+    """
+    The table of the aliquot sums s(n) of the integers ``0 <= n < ubound``
+    (see ``aliquot_sum_sieve``), which answers the abundance classes of the
+    integers, the amicable pairs and the aliquot cycles below ``ubound`` in
+    linear passes over the table, e.g.
+    ::
+        >>> t = AliquotTable(10 ** 4)
+        >>> t[220], t.abundance(12), t.counts()
+        >>> (284, 'abundant', {'deficient': 7508, 'perfect': 4, 'abundant': 2487})
+        >>> list(t.amicable_pairs())
+        >>> [(220, 284), (1184, 1210), (2620, 2924), (5020, 5564), (6232, 6368)]
+
+    The results are generated, in ascending order, rather than collected,
+    and the only storage is the table (and with NumPy, one more array of the
+    same size for the cycle detection and bounded temporary arrays).
+    """
+    __slots__ = ('ubound', 'sums')
+
+    def __init__(self, ubound):
+        self.ubound = max(ubound, 0)
+        self.sums = aliquot_sum_sieve(self.ubound)
+
+    def __repr__(self):
+        return 'AliquotTable({})'.format(self.ubound)
+
+    def __len__(self):
+        return self.ubound
+
+    def __getitem__(self, n):
+        """
+        Returns s(n) for ``0 <= n < ubound``.
+        """
+        if not 0 <= n < self.ubound:
+            raise IndexError('{} is outside the table'.format(n))
+        return int(self.sums[n])
+
+    def _blocks(self):
+        """
+        Returns the pair of the NumPy module and a generator of the
+        consecutive sub-ranges of ``[1, ubound)`` of ``ALIQUOT_BLOCK_SIZE``
+        integers, or None if the table is not a NumPy array.
+        """
+        if isinstance(self.sums, array):
+            return None
+        import numpy as np
+
+        return np, (range(i, min(i + ALIQUOT_BLOCK_SIZE, self.ubound)) for i in range(1, self.ubound, ALIQUOT_BLOCK_SIZE))
+
+    def abundance(self, n):
+        """
+        Returns the abundance class of a positive integer ``n < ubound``:
+        'deficient' if s(n) < n, 'perfect' if s(n) = n, and 'abundant' if
+        s(n) > n.
+        """
+        if n < 1:
+            raise ValueError('{} is not a positive integer'.format(n))
+        m = self[n]
+        return ABUNDANCE_CLASSES[(m > n) - (m < n) + 1]
+
+    def numbers(self, abundance_class):
+        """
+        Generates the positive integers below ``ubound`` of the given
+        abundance class ('deficient', 'perfect' or 'abundant'), e.g.
+        ::
+            'perfect' -> 6, 28, 496, 8128, ...
+        """
+        if abundance_class not in ABUNDANCE_CLASSES:
+            raise ValueError('Unknown abundance class {!r}'.format(abundance_class))
+        sign = ABUNDANCE_CLASSES.index(abundance_class) - 1
+        blocks = self._blocks()
+        if blocks is None:
+            sums = self.sums
+            yield from (n for n in range(1, self.ubound) if (sums[n] > n) - (sums[n] < n) == sign)
+            return
+
+        np, blocks = blocks
+        for block in blocks:
+            signs = np.sign(self.sums[block.start:block.stop] - np.arange(block.start, block.stop))
+            yield from (block.start + np.flatnonzero(signs == sign)).tolist()
+
+    def counts(self):
+        """
+        Returns the dict of the numbers of the positive integers below
+        ``ubound`` in each abundance class.
+        """
+        counts = [0, 0, 0]
+        blocks = self._blocks()
+        if blocks is None:
+            for n, m in enumerate(self.sums):
+                counts[(m > n) - (m < n) + 1] += n > 0
+        else:
+            np, blocks = blocks
+            for block in blocks:
+                signs = np.sign(self.sums[block.start:block.stop] - np.arange(block.start, block.stop))
+                for i, k in enumerate(np.bincount(signs + 1, minlength=3).tolist()):
+                    counts[i] += k
+        return dict(zip(ABUNDANCE_CLASSES, counts))
+
+    def amicable_pairs(self):
+        """
+        Generates the amicable pairs ``(n, m)`` with ``n < m < ubound``, i.e.
+        the pairs with s(n) = m and s(m) = n, in ascending order of ``n``.
+        """
+        sums = self.sums
+        blocks = self._blocks()
+        if blocks is None:
+            for n in range(1, self.ubound):
+                m = sums[n]
+                if n < m < self.ubound and sums[m] == n:
+                    yield n, m
+            return
+
+        np, blocks = blocks
+        for block in blocks:
+            ns = np.arange(block.start, block.stop)
+            ms = sums[block.start:block.stop]
+            candidates = (ms > ns) & (ms < self.ubound)
+            ns, ms = ns[candidates], ms[candidates]
+            paired = sums[ms] == ns
+            yield from zip(ns[paired].tolist(), ms[paired].tolist())
+
+    def _successor(self, n):
+        # The aliquot map restricted to the table, with 0 as the sink for
+        # the sums outside it.
+        m = int(self.sums[n])
+        return m if m < self.ubound else 0
+
+    def _cycle(self, n):
+        cycle = [n]
+        m = self._successor(n)
+        while m != n:
+            cycle.append(m)
+            m = self._successor(m)
+        return tuple(cycle)
+
+    def cycles(self, length=None):
+        """
+        Generates the cycles of the aliquot map n -> s(n) all of whose
+        members are below ``ubound``, i.e. the perfect numbers (cycles of
+        length 1), the amicable pairs (length 2) and the sociable cycles
+        (length > 2), or only those of the given length, as tuples starting
+        from their least members, in ascending order of these, e.g.
+        ::
+            10 ** 5 -> (6,), (28,), (220, 284), (496,), ..., (12496, 14288, 15472, 14536, 14264), ...
+
+        The cycles are found on the functional graph of the map, restricted
+        to the table. Without NumPy the graph is walked from each integer
+        in turn, stamping the integers visited by the walk, which stops at a
+        stamped integer (or leaves the table), and a cycle is found when
+        this has the stamp of the current walk, so that each integer is
+        visited once. With NumPy the map is composed with itself by pointer
+        doubling (``g = g[g]``) until every integer is mapped onto its
+        terminal cycle, so that the members of the cycles are the image.
+        """
+        blocks = self._blocks()
+        if blocks is None:
+            found = []
+            stamps = array('q', bytes(8 * self.ubound))
+            for n in range(1, self.ubound):
+                # The cycles with least members below n have all been found.
+                while found and found[0][0] < n:
+                    cycle = heapq.heappop(found)
+                    if length is None or len(cycle) == length:
+                        yield cycle
+                if stamps[n]:
+                    continue
+                m = n
+                while m and not stamps[m]:
+                    stamps[m] = n
+                    m = self._successor(m)
+                if m and stamps[m] == n:
+                    cycle = self._cycle(m)
+                    i = cycle.index(min(cycle))
+                    heapq.heappush(found, cycle[i:] + cycle[:i])
+            while found:
+                cycle = heapq.heappop(found)
+                if length is None or len(cycle) == length:
+                    yield cycle
+            return
+
+        np, _ = blocks
+        g = self.sums.astype(np.intp)
+        g[g >= self.ubound] = 0
+        for _ in range(self.ubound.bit_length()):
+            g = g[g]
+        members = np.zeros(self.ubound, dtype=bool)
+        members[g] = True
+        members[:1] = False
+        del g
+
+        seen = set()
+        for n in np.flatnonzero(members).tolist():
+            if n not in seen:
+                cycle = self._cycle(n)
+                seen.update(cycle)
+                if length is None or len(cycle) == length:
+                    yield cycle
+
+
+def amicable_pairs(ubound):
+    """
+    Generates the amicable pairs ``(n, m)`` with ``n < m < ubound``, from an
+    ``AliquotTable``, e.g.
+    ::
+        3000 -> (220, 284), (1184, 1210), (2620, 2924)
+    """
+    yield from AliquotTable(ubound).amicable_pairs()
+
+
+def aliquot_cycles(ubound, length=None):
+    """
+    Generates the aliquot cycles (of the given length, if any) all of whose
+    members are below ``ubound``, from an ``AliquotTable``, e.g.
+    ::
+        (20000, None) -> (6,), (28,), (220, 284), (496,), (1184, 1210), ...
+        (20000, 5)    -> (12496, 14288, 15472, 14536, 14264)
+    """
+    yield from AliquotTable(ubound).cycles(length=length)
@@ -17,18 +17,21 @@ from itertools import (
 from functools import partial
 
 from inttools.primes import prime_factors
+from inttools.utils.cache import cached
+from inttools.utils.profiling import profiled
 from inttools.arithmetic import (
     generalised_product,
     generalised_sum,
 )
 
 
-def _divisors(n):
+@profiled('divisors', tier='factorisation', counters=lambda divs, n: {'divisors': len(divs)})
+@cached('divisors', maxsize=2 ** 12, maxbytes=2 ** 26)
+def _divisor_list(n):
     """
-    Generates the sequence of divisors of a given positive integer n, in
-    ascending order, e.g.:
-
-        312 -> 1, 2, 3, 4, 6, 8, 12, 13, 24, 26, 39, 52, 78, 104, 156, 312
+        Returns the tuple of divisors of a given positive integer n, in
+        ascending order, from its prime factorisation. Divisor lists are
+        cached (in the 'divisors' cache).
     """
     pfs = OrderedDict((pf[0], pf[1]) for pf in prime_factors(n, multiplicities=True))
     divs = [
@@ -39,8 +42,17 @@ def _divisors(n):
         )
     ]
     divs.sort()
-    for div in divs:
-        yield div
+    return tuple(divs)
+
+
+def _divisors(n):
+    """
+    Generates the sequence of divisors of a given positive integer n, in
+    ascending order, e.g.:
+
+        312 -> 1, 2, 3, 4, 6, 8, 12, 13, 24, 26, 39, 52, 78, 104, 156, 312
+    """
+    yield from _divisor_list(n)
 
 
 def divisors(n, generator=False):
@@ -54,7 +66,7 @@ def divisors(n, generator=False):
     return divs
 
 
-def d(n):
+def d(n, mod=None):
     """
     Returns the number of all divisors of a given positive integer ``n``,
     including proper and improper divisors, e.g. the divisors of ``10``
@@ -71,23 +83,40 @@ def d(n):
     of ``n`` is equal to the product
     ::
         (e_1 + 1) x (e_2 + 1) x ... x (e_k + 1)
+
+    which is reduced by the modulus ``mod``, if given.
     """
-    return generalised_product((pf[1] + 1) for pf in prime_factors(n, multiplicities=True))
+    return generalised_product(((pf[1] + 1) for pf in prime_factors(n, multiplicities=True)), mod=mod)
 
 
-def sigma(n, k):
+def sigma(n, k, mod=None):
     """
     The sum of the k-th powers of the divisors of n - in number theory this
-    is traditionally denoted by \sigma_k(n) (LaTeX notation):
+    is traditionally denoted by \sigma_k(n) (LaTeX notation), reduced by a
+    given modulus ``mod``:
 
-        (12, 2) -> 1^2 + 2^2 + 3^2 + 4^2 + 6^2 + 12^2 = 210
+        (12, 2, None) -> 1^2 + 2^2 + 3^2 + 4^2 + 6^2 + 12^2 = 210
+        (12, 2, 11)   -> 210 mod 11 = 1
+
+    As \sigma_k is multiplicative it is computed from the prime
+    factorisation of n, without listing the divisors, as the product of the
+    sums
+    ::
+        1 + p^k + p^(2k) + ... + p^(ek)
+
+    over the prime powers p^e in the factorisation, which with a modulus
+    are computed modulo it.
     """
-    return generalised_sum(_divisors(n), k=k)
+    return generalised_product(
+        (generalised_sum((p ** i for i in range(e + 1)), k=k, mod=mod) for p, e in prime_factors(n, multiplicities=True)),
+        mod=mod
+    )
 
 
-def sigma_k_func(k):
+def sigma_k_func(k, mod=None):
     """
-    Returns the restriction of the sigma function obtained by fixing k, e.g.
+    Returns the restriction of the sigma function obtained by fixing k (and
+    the modulus), e.g.
 
         >>> s2 = sigma_k_func(2)
 
@@ -95,14 +124,18 @@ def sigma_k_func(k):
         >>> 210
     """
 
-    return partial(sigma, k=k)
+    return partial(sigma, k=k, mod=mod)
 
 
-def s(n):
+def s(n, mod=None):
     """
-    Returns sum of the proper divisors of a positive integer n, e.g.
+    Returns sum of the proper divisors of a positive integer n, reduced by a
+    given modulus ``mod``, e.g.
 
         12 -> 1 + 2 + 3 + 4 + 6 = 16
-     """
-    return sum(filter(lambda d: d < n, _divisors(n)))
 
+    This is \sigma_1(n) - n, computed from the prime factorisation of n.
+     """
+    if mod is None:
+        return sigma(n, 1) - n
+    return (sigma(n, 1, mod=mod) - n) % mod
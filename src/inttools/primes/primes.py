@@ -1,13 +1,38 @@
-import math
+from inttools.arithmetic import (
+    isqrt,
+    rotations,
+)
+from inttools.utils.cache import cached
+from inttools.utils.profiling import profiled
 
-from inttools.arithmetic import rotations
+
+def _trial_divisors_count(d):
+    """
+        The number of trial divisors 2, 3, 5, 7, ... up to d.
+    """
+    return 0 if d < 2 else 1 + (d - 1) // 2
+
+
+def _is_prime_instrumented(n):
+    # ``is_prime``, with the number of the trial divisions, for profiling.
+    if n < 3 or n % 2 == 0:
+        return n == 2, {'trial_divisions': 0}
+
+    r = isqrt(n)
+    for i in range(3, r + 1, 2):
+        if n % i == 0:
+            return False, {'trial_divisions': (i - 1) // 2}
+
+    return True, {'trial_divisions': (r - 1) // 2}
 
 
+@profiled('is_prime', tier='trial_division', instrumented=_is_prime_instrumented)
 def is_prime(n):
     """
-        Primality checker using trial division.
+        Primality checker using trial division by odd numbers up to the
+        (exact) integer square root of n.
     """
-    if n == 1:
+    if n < 2:
         return False
 
     if n == 2:
@@ -16,13 +41,37 @@ def is_prime(n):
     if n % 2 == 0:
         return False
 
-    for i in range(3, math.ceil(math.sqrt(n)) + 1, 2):
+    for i in range(3, isqrt(n) + 1, 2):
         if n % i == 0:
             return False
 
     return True
 
 
+def _prime_sieve_counters(result, ubound):
+    return {'sieving_primes': sum(result[:isqrt(max(ubound - 1, 0)) + 1])}
+
+
+@profiled('prime_sieve', tier='sieve', counters=_prime_sieve_counters)
+@cached('prime_sieve', maxsize=16, maxbytes=2 ** 27)
+def prime_sieve(ubound):
+    """
+        Returns a bytes object of flags for the integers 0, 1, ..., ubound - 1,
+        where the flag at index n is 1 if n is prime and 0 otherwise, using
+        the sieve of Eratosthenes, e.g.
+
+            10 -> 0, 0, 1, 1, 0, 1, 0, 1, 0, 0
+
+        Sieves are cached (in the 'prime_sieve' cache).
+    """
+    sieve = bytearray(b'\x01') * max(ubound, 0)
+    sieve[:2] = bytes(len(sieve[:2]))
+    for p in range(2, isqrt(max(ubound - 1, 0)) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytes(len(range(p * p, ubound, p)))
+    return bytes(sieve)
+
+
 def primes(index_range=None, int_range=None):
     """
         Generates all primes, by default. Can also generate primes within a
@@ -57,6 +106,46 @@ def primes(index_range=None, int_range=None):
         n += 1
 
 
+def _factorisation_counters(result, n):
+    # The trial division stops at the first divisor d after the last prime
+    # factor q found by it with d^2 greater than the remaining cofactor,
+    # which is the last prime factor if it has multiplicity 1, and 1
+    # otherwise.
+    if result and result[-1][1] == 1:
+        q = result[-2][0] if len(result) > 1 else 1
+        d = max(q, isqrt(result[-1][0]))
+    else:
+        d = result[-1][0] if result else 1
+    return {'trial_divisions': _trial_divisors_count(d)}
+
+
+@profiled('prime_factors', tier='trial_division', counters=_factorisation_counters)
+@cached('prime_factors', maxsize=2 ** 16, maxbytes=2 ** 26)
+def _factorisation(n):
+    """
+        Returns the prime factorisation of a positive integer n as a tuple of
+        pairs of prime factors and their multiplicities, found by trial
+        division (with exact integer arithmetic) up to the square root of the
+        remaining cofactor. Factorisations are cached (in the 'prime_factors'
+        cache).
+    """
+    pfs = []
+    d = 2
+    while d * d <= n:
+        if n % d == 0:
+            m = 0
+            while n % d == 0:
+                n //= d
+                m += 1
+            pfs.append((d, m))
+        d += 1 if d == 2 else 2
+
+    if n > 1:
+        pfs.append((n, 1))
+
+    return tuple(pfs)
+
+
 def prime_factors(n, multiplicities=False):
     """
         Generates the distinct prime factors of a positive integer n in an
@@ -68,33 +157,17 @@ def prime_factors(n, multiplicities=False):
             54 -> 2, 3
             54, multiplicities=True -> (2, 1), (3, 3)
 
-        This is precisely the prime factorisation of n.
+        This is precisely the prime factorisation of n - see
+        ``_factorisation``.
     """
     if n == 1:
         return
 
-    if is_prime(n):
+    for p, m in _factorisation(n):
         if not multiplicities:
-            yield n
+            yield p
         else:
-            yield n, 1
-        return
-
-    i = 0
-    d = 2
-    ub = math.ceil(n / 2) + 1
-    while d <= ub:
-        q = n / d
-        if q.is_integer() and is_prime(d):
-            if i == 1:
-                ub = min(ub, q)
-            if not multiplicities:
-                yield d
-            else:
-                m = max(e for e in reversed(range(1, math.ceil(math.log(n, d)))) if n % (d**e) == 0)
-                yield d, m
-            i += 1
-        d += 1 
+            yield p, m
 
 
 def is_circular_prime(n):
@@ -34,16 +34,112 @@ def champernowne_sequence(digits=None):
         i += 1
 
 
-def champernowne_sequence_term(n):
+def _champernowne_locate(n, base=10):
+    """
+        Returns the integer m containing the n-th digit of the fractional
+        part of the (base ``base``) Champernowne constant, the number of
+        digits k of m, and the offset of the digit in m (counting from 0 at
+        the most significant digit).
+
+        This skips whole blocks of integers with the same number of digits,
+        which contain (b - 1)b^(k - 1) integers of k digits each, i.e.
+
+            9 x 1, 90 x 2, 900 x 3, ...
+
+        digits in the decimal case, so that it takes O(log n) steps.
+    """
+    if n < 1:
+        raise ValueError('The digit position n must be a positive integer')
+    if base < 2:
+        raise ValueError('Base must be an integer greater than 1')
+
+    k = 1
+    first = 1
+    count = base - 1
+    while n > k * count:
+        n -= k * count
+        k += 1
+        first *= base
+        count *= base
+
+    q, r = divmod(n - 1, k)
+    return first + q, k, r
+
+
+def champernowne_sequence_term(n, base=10):
     """
         Returns the n-th digit of the fractional part of the Champernowne
-        constant.
+        constant, or of its analogue in the given base (obtained by
+        concatenating the base ``base`` representations of the positive
+        integers), e.g.
+
+            10 -> 1
+            11 -> 0
+            10 ** 12 -> 1
+
+        The owning integer and the offset of the digit in it are computed
+        directly, so this takes O(log n) steps.
     """
-    d = 0   
-    m = 1
-    while True:
-        for c in str(m):
-            d += 1
-            if d == n:
-                return int(c)
+    m, k, r = _champernowne_locate(n, base=base)
+    return (m // base ** (k - 1 - r)) % base
+
+
+_ASCII_DIGITS = bytes.maketrans(b'0123456789', bytes(range(10)))
+
+
+def champernowne_digits(start, stop, base=10):
+    """
+        Returns the contiguous slice of digits of the fractional part of the
+        Champernowne constant (or its analogue in the given base) at the
+        positions ``start``, ``start + 1``, ..., ``stop - 1`` as a bytes
+        object of digit values, e.g.
+
+            1, 12 -> bytes([1, 2, 3, 4, 5, 6, 7, 8, 9, 1, 0])
+
+        Positions start from 1, as with ``champernowne_sequence_term``, and
+        the base must be at most 256.
+    """
+    if base > 256:
+        raise ValueError('Base must be at most 256 for digits to fit into bytes')
+    if stop <= start:
+        return bytes()
+
+    m, k, r = _champernowne_locate(start, base=base)
+    length = stop - start
+
+    if base == 10:
+        # Enough consecutive integers to cover the slice, as they have at
+        # least k digits each.
+        s = ''.join(map(str, range(m, m + (r + length) // k + 1)))
+        return s[r:r + length].encode('ascii').translate(_ASCII_DIGITS)
+
+    digs = bytearray()
+    while len(digs) < r + length:
+        d = bytearray()
+        q = m
+        while q:
+            q, t = divmod(q, base)
+            d.append(t)
+        d.reverse()
+        digs += d
         m += 1
+    return bytes(digs[r:r + length])
+
+
+def champernowne_digits_product(positions, base=10):
+    """
+        Returns the product of the digits of the fractional part of the
+        Champernowne constant (or its analogue in the given base) at the
+        given positions, e.g.
+
+            [1, 10, 100, 1000, 10000, 100000, 1000000] -> 210
+
+        Each digit is looked up directly, and the product is short-circuited
+        as soon as a zero digit is found.
+    """
+    p = 1
+    for n in positions:
+        p *= champernowne_sequence_term(n, base=base)
+        if p == 0:
+            return 0
+    return p
@@ -1,3 +1,7 @@
+from inttools.utils.cache import register_cache
+from inttools.utils.profiling import profiled
+
+
 def collatz(n):
     """
         The Collatz sequence generating function:
@@ -20,15 +24,16 @@ def collatz_sequence_term(seed, k):
     return a
 
 
-COLLATZ_CACHE = dict()
+COLLATZ_CACHE = register_cache('collatz', maxsize=2 ** 20)
 
 
+@profiled('collatz_sequence', counters=lambda k, seed: {'collatz_steps': k - 1})
 def collatz_sequence(seed):
     """
         Generates the entire Collatz sequence for the given seed.
 
         Uses a module-level global cache for the collatz transform
-        values.
+        values, which is bounded (the 'collatz' cache).
     """
     global COLLATZ_CACHE
 
@@ -65,3 +70,204 @@ def longest_sequence_seed(ubound):
             max_seq_len = seq_len
             max_seq_seed = seed
     return max_seq_seed, max_seq_len
+
+
+def _collatz_descent(n, start, steps=0, peak=None):
+    """
+        Continues the Collatz trajectory from the value ``n`` (reached after
+        ``steps`` steps from the seed ``start``) until it drops below
+        ``start`` or reaches 1. Returns the number of steps taken from the
+        seed, the peak value seen and the value at which it stopped.
+    """
+    peak = n if peak is None else max(peak, n)
+    while n >= start and n != 1:
+        n = n >> 1 if n % 2 == 0 else 3*n + 1
+        steps += 1
+        if n > peak:
+            peak = n
+    return steps, peak, n
+
+
+@profiled('collatz_stats', counters=lambda stats, seed: {'collatz_steps': stats[1]})
+def collatz_stats(seed):
+    """
+        Returns the stopping time, the total stopping time and the peak
+        value of the Collatz sequence with the given (positive) seed, e.g.
+
+            27 -> 96, 111, 9232
+
+        The stopping time is the number of steps taken for the sequence to
+        first drop below the seed, and the total stopping time is the
+        number of steps taken to reach 1. By convention both are 0 for a
+        seed of 1.
+    """
+    if seed < 1:
+        raise ValueError('The seed must be a positive integer')
+
+    stopping_time, peak, n = _collatz_descent(seed, seed)
+    total_stopping_time = stopping_time
+    while n != 1:
+        steps, peak, n = _collatz_descent(n, n, steps=total_stopping_time, peak=peak)
+        total_stopping_time = steps
+
+    return stopping_time, total_stopping_time, peak
+
+
+def _collatz_batch_descent(np, seeds):
+    """
+        Advances an array of distinct seeds (of a signed or unsigned 64-bit
+        integer type) in lockstep until each one drops below its seed or
+        reaches 1, using masked ``n // 2`` and ``3n + 1`` updates. Seeds
+        whose trajectories would overflow the array type are finished off
+        with Python ints.
+
+        Returns arrays of stopping times, peak values and the values at
+        which the seeds stopped. The peaks array has an object type if any
+        of the peaks do not fit into the array type.
+    """
+    m = len(seeds)
+    limit = (int(np.iinfo(seeds.dtype).max) - 1) // 3
+
+    stopping_times = np.zeros(m, dtype=np.int64)
+    peaks = seeds.copy()
+    landings = seeds.copy()
+    outliers = []
+
+    idx = np.flatnonzero(seeds != 1)
+    cur = seeds[idx]
+    start = cur.copy()
+    peak = cur.copy()
+    steps = 0
+
+    while len(idx):
+        odd = (cur & 1).astype(bool)
+        overflow = odd & (cur > limit)
+        if overflow.any():
+            for i, n, p in zip(idx[overflow], cur[overflow], peak[overflow]):
+                outliers.append((i, _collatz_descent(int(n), int(seeds[i]), steps, int(p))))
+            keep = ~overflow
+            idx, cur, start, peak, odd = idx[keep], cur[keep], start[keep], peak[keep], odd[keep]
+
+        cur = np.where(odd, 3*cur + 1, cur >> 1)
+        np.maximum(peak, cur, out=peak)
+        steps += 1
+
+        done = (cur < start) | (cur == 1)
+        if done.any():
+            stopping_times[idx[done]] = steps
+            peaks[idx[done]] = peak[done]
+            landings[idx[done]] = cur[done]
+            keep = ~done
+            idx, cur, start, peak = idx[keep], cur[keep], start[keep], peak[keep]
+
+    if outliers:
+        peaks = peaks.astype(object)
+        for i, (steps, peak, n) in outliers:
+            stopping_times[i] = steps
+            peaks[i] = peak
+            landings[i] = n
+
+    return stopping_times, peaks, landings
+
+
+def _collatz_batch_tier(results, seeds):
+    return 'python' if isinstance(results[0], list) else 'numpy'
+
+
+def _collatz_batch_counters(results, seeds):
+    stopping_times, totals, _ = results
+    return {
+        'seeds': len(stopping_times) if isinstance(stopping_times, list) else stopping_times.size,
+        'collatz_steps': int(sum(totals)) if isinstance(totals, list) else int(totals.sum()),
+    }
+
+
+@profiled('collatz_batch', tier=_collatz_batch_tier, counters=_collatz_batch_counters)
+def collatz_batch(seeds):
+    """
+        Batch version of ``collatz_stats`` for an array (or any sequence) of
+        positive seeds, which returns a triple of arrays of the stopping
+        times, the total stopping times and the peak values of the seeds,
+        e.g.
+
+            [3, 7, 27] -> [6, 11, 96], [7, 16, 111], [16, 52, 9232]
+
+        The seeds are advanced in lockstep as NumPy arrays and are retired
+        as soon as they drop below their seeds or reach 1. The total
+        stopping times and peaks are then obtained by repeating this on the
+        (distinct) values where the seeds stopped, until they all reach 1.
+        Seeds whose trajectories overflow 64-bit integers, and seeds which
+        do not themselves fit into 64-bit integers (e.g. in an array of
+        object type), are computed with Python ints, in which case the
+        peaks array has an object type.
+
+        NumPy is an optional dependency: if it is not installed the results
+        are computed with ``collatz_stats`` and returned as lists.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        stats = [collatz_stats(int(seed)) for seed in seeds]
+        return tuple(list(t) for t in zip(*stats)) if stats else ([], [], [])
+
+    seeds = np.asarray(seeds)
+    if seeds.dtype == object:
+        fits = np.array([-(1 << 63) <= seed < 1 << 63 for seed in seeds.ravel()], dtype=bool).reshape(seeds.shape)
+        if not fits.all():
+            return _collatz_batch_mixed(np, seeds, fits)
+    if seeds.dtype != np.uint64:
+        seeds = seeds.astype(np.int64)
+    return _collatz_batch_lockstep(np, seeds)
+
+
+def _collatz_batch_lockstep(np, seeds):
+    """
+        The body of ``collatz_batch`` for an array of seeds of a signed or
+        unsigned 64-bit integer type.
+    """
+    if seeds.size and seeds.min() < 1:
+        raise ValueError('The seeds must be positive integers')
+
+    values, inverse = np.unique(seeds.ravel(), return_inverse=True)
+    rounds = []
+    while len(values):
+        stopping_times, peaks, landings = _collatz_batch_descent(np, values)
+        rounds.append((values, stopping_times, peaks, landings))
+        values = np.unique(landings[landings > 1])
+
+    if not rounds:
+        empty = np.zeros(seeds.shape, dtype=np.int64)
+        return empty, empty.copy(), seeds.copy()
+
+    next_values, totals, peaks, _ = rounds[-1]
+    for values, stopping_times, round_peaks, landings in reversed(rounds[:-1]):
+        pos = np.minimum(np.searchsorted(next_values, landings), len(next_values) - 1)
+        landed = landings == 1
+        totals = stopping_times + np.where(landed, 0, totals[pos])
+        peaks = np.maximum(round_peaks, np.where(landed, round_peaks, peaks[pos]))
+        next_values = values
+
+    return (
+        rounds[0][1][inverse].reshape(seeds.shape),
+        totals[inverse].reshape(seeds.shape),
+        peaks[inverse].reshape(seeds.shape),
+    )
+
+
+def _collatz_batch_mixed(np, seeds, fits):
+    """
+        ``collatz_batch`` for an object array of seeds, some of which do not
+        fit into 64-bit integers (as marked by the boolean array ``fits``):
+        these are computed with ``collatz_stats``, and the others in
+        lockstep.
+    """
+    stopping_times = np.zeros(seeds.shape, dtype=np.int64)
+    totals = np.zeros(seeds.shape, dtype=np.int64)
+    peaks = np.zeros(seeds.shape, dtype=object)
+    if fits.any():
+        stopping_times[fits], totals[fits], peaks[fits] = _collatz_batch_lockstep(np, seeds[fits].astype(np.int64))
+
+    for i in zip(*np.nonzero(~fits)):
+        stopping_times[i], totals[i], peaks[i] = collatz_stats(int(seeds[i]))
+
+    return stopping_times, totals, peaks
@@ -6,6 +6,256 @@ from itertools import (
 )
 
 from inttools.arithmetic import binomial
+from inttools.utils import ilog
+
+
+class _ProgressionView:
+    """
+        Base class for lazy, range-like views of (finite or infinite)
+        integer progressions, with 0-based indexing and slicing. Subclasses
+        implement the term, sub-view and (exact) inverse index functions.
+    """
+    __slots__ = ('length',)
+
+    def __init__(self, length=None):
+        if length is not None and length < 0:
+            raise ValueError('The length of a progression must be non-negative')
+        self.length = length
+
+    def _term(self, i):
+        raise NotImplementedError
+
+    def _sub(self, i, step, length):
+        raise NotImplementedError
+
+    def _index(self, x):
+        raise NotImplementedError
+
+    def __len__(self):
+        if self.length is None:
+            raise TypeError('An unbounded progression has no length')
+        return self.length
+
+    def __bool__(self):
+        return self.length != 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if self.length is not None:
+                r = range(self.length)[key]
+                return self._sub(r.start if r else 0, r.step, len(r))
+            start, stop, step = key.start or 0, key.stop, key.step or 1
+            if start < 0 or (stop is not None and stop < 0) or step < 0:
+                raise ValueError('Unbounded progressions do not support negative slice indices or steps')
+            length = None if stop is None else len(range(start, stop, step))
+            return self._sub(start, step, length)
+
+        i = key
+        if i < 0:
+            if self.length is None:
+                raise IndexError('Unbounded progressions do not support negative indices')
+            i += self.length
+        if i < 0 or (self.length is not None and i >= self.length):
+            raise IndexError('Progression index out of range')
+        return self._term(i)
+
+    def __iter__(self):
+        i = 0
+        while self.length is None or i < self.length:
+            yield self._term(i)
+            i += 1
+
+    def __contains__(self, x):
+        return self._index(x) is not None
+
+    def index(self, x):
+        """
+            Returns the (0-based) index of the first occurrence of ``x`` in
+            the progression, or raises a ``ValueError`` if it does not
+            occur.
+        """
+        i = self._index(x)
+        if i is None:
+            raise ValueError('{} is not in the progression'.format(x))
+        return i
+
+    def _bounded(self, i):
+        return i if i is not None and (self.length is None or i < self.length) else None
+
+
+class ArithmeticProgression(_ProgressionView):
+    """
+        A lazy view of the arithmetic progression with a first term of 'a'
+        and a common difference of 'd', with an optional length:
+
+            a, a + d, a + 2d, ...
+
+        Like ``range`` it supports indexing, slicing into sub-views, ``len``
+        (for bounded views) and ``index``, and membership is tested in O(1)
+        with exact integer arithmetic, e.g.
+
+            >>> ap = ArithmeticProgression(1, 4)
+
+            >>> ap[10], ap[5:8], 4001 in ap, ap.index(4001)
+            >>> (41, ArithmeticProgression(21, 4, length=3), True, 1000)
+    """
+    __slots__ = ('a', 'd')
+
+    def __init__(self, a, d, length=None):
+        super().__init__(length=length)
+        self.a = a
+        self.d = d
+
+    def __repr__(self):
+        return 'ArithmeticProgression({}, {}, length={})'.format(self.a, self.d, self.length)
+
+    def _term(self, i):
+        return self.a + i * self.d
+
+    def _sub(self, i, step, length):
+        return ArithmeticProgression(self.a + i * self.d, step * self.d, length=length)
+
+    def __iter__(self):
+        x = self.a
+        i = 0
+        while self.length is None or i < self.length:
+            yield x
+            x += self.d
+            i += 1
+
+    def _index(self, x):
+        if self.d == 0:
+            return self._bounded(0 if x == self.a else None)
+        q, r = divmod(x - self.a, self.d)
+        return self._bounded(q if r == 0 and q >= 0 else None)
+
+    def within(self, int_range):
+        """
+            Returns the sub-view of terms which lie in the given range, which
+            may have any step, in the order of the progression. As the
+            intersection of two arithmetic progressions this is again an
+            arithmetic progression, e.g. for the Hilbert numbers below 100
+            which are 2 mod 3:
+
+                >>> ArithmeticProgression(1, 4).within(range(2, 100, 3))
+                >>> ArithmeticProgression(5, 12, length=8)
+
+            A ``ValueError`` is raised for an unbounded constant progression
+            whose term lies in the range.
+        """
+        a, d, r = self.a, self.d, int_range
+        if not r:
+            return ArithmeticProgression(a, d, length=0)
+
+        lo, hi = min(r[0], r[-1]), max(r[0], r[-1])
+        if d == 0:
+            if a not in r:
+                return ArithmeticProgression(a, d, length=0)
+            if self.length is None:
+                raise ValueError('An unbounded constant progression has infinitely many terms in the range')
+            return self[:]
+
+        # The index bounds of the terms lying in [lo, hi].
+        if d > 0:
+            i_lo, i_hi = -((a - lo) // d), (hi - a) // d
+        else:
+            i_lo, i_hi = -((a - hi) // d), (lo - a) // d
+        i_lo = max(i_lo, 0)
+        if self.length is not None:
+            i_hi = min(i_hi, self.length - 1)
+
+        # The indices i with a + id = r.start mod |r.step| form a residue
+        # class i = i_0 mod m, where m = |r.step| / gcd(d, |r.step|).
+        s = abs(r.step)
+        g = math.gcd(d, s)
+        if (r.start - a) % g:
+            return ArithmeticProgression(a, d, length=0)
+        m = s // g
+        i_0 = ((r.start - a) // g) * pow(d // g, -1, m) % m if m > 1 else 0
+
+        i = i_lo + (i_0 - i_lo) % m
+        length = (i_hi - i) // m + 1 if i <= i_hi else 0
+        return ArithmeticProgression(a + i * d, m * d, length=length)
+
+
+class GeometricProgression(_ProgressionView):
+    """
+        A lazy view of the geometric progression with a first term of 'a'
+        and a common ratio of 'r', with an optional length:
+
+            a, ar, ar^2, ...
+
+        Like ``range`` it supports indexing, slicing into sub-views (with
+        positive steps), ``len`` (for bounded views) and ``index``, and
+        membership is tested with exact integer arithmetic using the integer
+        logarithm, e.g.
+
+            >>> gp = GeometricProgression(3, 2)
+
+            >>> gp[10], gp[2::3], 3 * 2 ** 500 in gp, gp.index(3 * 2 ** 500)
+            >>> (3072, GeometricProgression(12, 8, length=None), True, 500)
+    """
+    __slots__ = ('a', 'r')
+
+    def __init__(self, a, r, length=None):
+        super().__init__(length=length)
+        self.a = a
+        self.r = r
+
+    def __repr__(self):
+        return 'GeometricProgression({}, {}, length={})'.format(self.a, self.r, self.length)
+
+    def _term(self, i):
+        return self.a * self.r ** i
+
+    def _sub(self, i, step, length):
+        if step < 0 and length > 1:
+            raise ValueError('Geometric progressions do not support negative slice steps')
+        return GeometricProgression(self._term(i), self.r ** abs(step), length=length)
+
+    def __iter__(self):
+        x = self.a
+        i = 0
+        while self.length is None or i < self.length:
+            yield x
+            x *= self.r
+            i += 1
+
+    def _index(self, x):
+        a, r = self.a, self.r
+        if x == a:
+            return self._bounded(0)
+        if a == 0:
+            return None
+        if r in (0, -1):
+            return self._bounded(1 if x == a * r else None)
+        if r == 1 or x == 0 or x % a:
+            return None
+
+        q = x // a
+        k = ilog(abs(q), abs(r))
+        return self._bounded(k if r ** k == q else None)
+
+    def within(self, int_range):
+        """
+            Returns the sub-view of terms which lie in the given range (of
+            step 1), for a positive first term 'a' and ratio 'r' > 1, with
+            the index bounds computed using the integer logarithm, e.g.
+
+                >>> GeometricProgression(3, 2).within(range(10, 1000))
+                >>> GeometricProgression(12, 2, length=7)
+        """
+        a, r = self.a, self.r
+        if not (a > 0 and r > 1 and int_range.step == 1):
+            raise ValueError('Only increasing progressions of positive integers and ranges of step 1 are supported')
+
+        start, stop = int_range.start, int_range.stop
+        i_lo = 0 if start <= a else ilog((start - 1) // a, r) + 1
+        i_hi = -1 if stop <= a else ilog((stop - 1) // a, r)
+        if self.length is not None:
+            i_hi = min(i_hi, self.length - 1)
+        return self[i_lo:i_hi + 1] if i_lo <= i_hi else GeometricProgression(a, r, length=0)
+
 
 def arithmetic(a, d, index_range=None, seq_range=None):
     """
@@ -17,25 +267,20 @@ def arithmetic(a, d, index_range=None, seq_range=None):
         The 'index_range' option can be used to specify a consecutive sequence
         of terms to generate, or the 'seq_range' option to specify an interval
         in which the generated terms should lie.
+
+        See ``ArithmeticProgression`` for an indexable view of the sequence.
     """
-    def t(n):
-        return a + (n - 1) * d
+    ap = ArithmeticProgression(a, d)
 
     if index_range:
         for n in index_range:
-            yield t(n)
+            yield ap._term(n - 1)
         return
     elif seq_range:
-        u = math.ceil(((seq_range.start - a) / d) + 1)
-        v = math.floor(((seq_range.stop - 1 - a) / d) + 1)
-        for n in range(u, v + 1):
-            yield t(n)
+        yield from ap.within(range(seq_range.start, seq_range.stop))
         return
 
-    k = 0
-    while True:
-        yield t(k)
-        k += 1
+    yield from ap
 
 
 def geometric(a, r, index_range=None, seq_range=None):
@@ -44,24 +289,20 @@ def geometric(a, r, index_range=None, seq_range=None):
         ratio of 'r':
 
             a, ar, ar^2, ...
+
+        See ``GeometricProgression`` for an indexable view of the sequence.
     """
-    def t(n):
-        return a * r ** (n - 1)
+    gp = GeometricProgression(a, r)
 
     if index_range:
         for n in index_range:
-            yield t(n)
+            yield gp._term(n - 1)
         return
     elif seq_range:
-        u = math.ceil(1 + math.log(seq_range.start / a, r))
-        v = math.floor(1 + math.log((seq_range.stop - 1) / a, r))
-        for n in range(u, v + 1):
-            yield t(n)
+        yield from gp.within(range(seq_range.start, seq_range.stop))
         return
-    k = 0
-    while True:
-        yield t(k)
-        k += 1
+
+    yield from gp
 
 
 def fibonacci():
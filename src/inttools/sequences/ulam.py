@@ -1,46 +1,103 @@
-from itertools import product
+from itertools import islice
 
-def ulam(a, b, k):
+
+def _ulam_terms(a, b):
+    """
+    Generates the terms of the U(a, b) sequence by keeping saturating counts
+    (0, 1, or 2 for "two or more") of the representations of candidate values
+    as sums of two distinct earlier terms, in a bytearray indexed by value.
+    The counts are updated incrementally as each new term is appended, and
+    the next term is the smallest value above the last term with a count of
+    exactly 1.
+    """
+    terms = [a, b]
+    counts = bytearray(2 * b + 2)
+    counts[a + b] = 1
+
+    yield a
+    yield b
+
+    t = b
+    while True:
+        n = t + 1
+        while counts[n] != 1:
+            n += 1
+        t = n
+
+        if len(counts) <= 2 * t:
+            counts.extend(bytes(2 * t + 1 - len(counts)))
+        for u in terms:
+            s = t + u
+            if counts[s] < 2:
+                counts[s] += 1
+        terms.append(t)
+
+        yield t
+
+
+def _ulam_2v_terms(v):
+    """
+    Generates the terms of the U(2, v) sequence for an odd v > 3, using the
+    fact that this sequence has exactly two even terms, 2 and 2v + 2, so that
+    its terms are eventually periodic in their differences (Schmerl and
+    Spiegel, Finch). Once 2v + 2 has been reached every further term n is
+    odd and has a unique representation if and only if exactly one of
+    n - 2 and n - (2v + 2) is a term, so that each candidate is decided in
+    constant time from a bytearray of term membership.
+    """
+    e = 2 * v + 2
+    member = bytearray(2 * e)
+
+    for t in _ulam_terms(2, v):
+        member[t] = 1
+        yield t
+        if t == e:
+            break
+
+    n = e + 1
+    while True:
+        if n >= len(member):
+            member.extend(bytes(len(member)))
+        if member[n - 2] ^ member[n - e]:
+            member[n] = 1
+            yield n
+        n += 2
+
+
+def ulam_sequence(a, b):
     """
-    An integer sequence defined as follows:
- 
+    Generates the U(a, b) Ulam sequence, defined for positive integers
+    a < b as follows:
+
         U(a, b, 1) = a
         U(a, b, 2) = b
-        U(a, b, k: k > 2) = min{U(a,b,k-i)+U(a,b,k-j) for i, j < k such that i != j and sum is unique}
- 
+        U(a, b, k: k > 2) = the least integer greater than U(a, b, k - 1)
+                            which is a sum of two distinct earlier terms in
+                            exactly one way
+
         e.g. first 25 terms of the U(2, 5) sequence:
- 
+
             2, 5, 7, 9, 11, 12, 13, 15, 19, 23, 27, 29, 35, 37, 41, 43, 45, 49, 51, 55, 61, 67, 69, 71, 79 ...
 
-    This is a recursive, therefore, slow, implementation, and at the moment is
-    purely to demonstrate the sequence for small values (k < 30).
-
-    """
-    if k == 1:
-        return a
-    elif k == 2:
-        return b
-
-    terms = {1: a, 2: b}
-    min_bound = ulam(a, b, k - 1)
-    terms[k - 1] = min_bound
-    sums = Counter()
-
-    for i, j in product(range(1, k - 1), range(i + 1, k)):
-        try:
-            ti = terms[i]
-        except KeyError:
-            ti = ulam(a, b, i)
-            terms[i] = ti
-        else:
-            try:
-                tj = terms[j]
-            except KeyError:
-                tj = ulam(a, b, j)
-                terms[j] = tj
-
-        s = ti + tj
-        if s > min_bound:
-            sums[s] += 1
-
-    return min(s for s in sums if sums[s] == 1 and s > min_bound)
+    The terms are generated incrementally, with the representation counts of
+    candidate values kept in a bytearray. For U(2, v) with an odd v > 3 there
+    is a much faster path which decides each candidate in constant time.
+    """
+    if not 0 < a < b:
+        raise ValueError('The initial terms must be positive integers a < b')
+
+    if a == 2 and b % 2 == 1 and b > 3:
+        return _ulam_2v_terms(b)
+
+    return _ulam_terms(a, b)
+
+
+def ulam(a, b, k):
+    """
+    Returns the k-th term of the U(a, b) Ulam sequence - see
+    ``ulam_sequence`` for the definition, e.g.
+
+        (1, 2, 10) -> 18
+        (2, 5, 25) -> 79
+    """
+    return next(islice(ulam_sequence(a, b), k - 1, None))
@@ -0,0 +1,646 @@
+"""
+An asyncio query server for the ``primes``, ``divisors`` and ``arithmetic``
+functions, and a matching async client, so that several services can share
+one process pool and one set of warm caches and tables, e.g.
+
+    $ python -m inttools serve --port 7391
+
+    >>> async with await Client.connect(port=7391) as client:
+    ...     await client.call('prime_factors', 360)
+    >>> [[2, 3], [3, 2], [5, 1]]
+
+The protocol is JSON lines over TCP or a Unix socket: each request is an
+object ``{"id": ..., "method": ..., "params": [...]}`` and is answered by
+``{"id": ..., "result": ...}`` or ``{"id": ..., "error": ...}``, in the order
+in which the results become available (so that the requests on a connection
+can be pipelined).
+
+The server answers repeated queries from a shared result cache (the
+'server' cache), coalesces duplicate queries which are in flight, and
+micro-batches the queries for each method, which arrive within a short
+window, into bulk calls to a pool of worker processes. The queries are
+bounded in their arguments and in time: the workers of a query which
+times out are terminated and replaced.
+"""
+import asyncio
+import itertools
+import json
+import os
+
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+from inttools.arithmetic import (
+    additive_persistence,
+    binomial,
+    binomial2,
+    crt,
+    digit_product,
+    digit_sum,
+    digits_,
+    factorial,
+    generalised_product,
+    generalised_sum,
+    int_concatenate,
+    int_from_digits,
+    int_permutations,
+    iroot,
+    is_pandigital,
+    is_perfect_power,
+    is_square,
+    isqrt,
+    mod_inverse,
+    mod_inverses,
+    multinomial,
+    multiplicative_persistence,
+    num_digits,
+    power_table,
+    product_of_digits,
+    rotation,
+    rotations,
+    sum_of_digits,
+)
+from inttools.divisors import (
+    d,
+    divisors,
+    s,
+    sigma,
+)
+from inttools.primes import (
+    circular_primes,
+    is_circular_prime,
+    is_prime,
+    prime_factors,
+    prime_sieve,
+)
+from inttools.special_sets import range_mask
+from inttools.utils.cache import register_cache
+
+
+DEFAULT_PORT = 7391
+
+# The size of the prime sieve which is built when the server starts (and
+# inherited by forked workers), and from which ``is_prime`` queries below it
+# are answered in bulk.
+SERVER_SIEVE_SIZE = 1 << 22
+
+# The maximum length of a request line, and the maximum number of requests
+# in flight per connection.
+LINE_LIMIT = 1 << 20
+
+MAX_IN_FLIGHT = 1 << 10
+
+# The default time after which a query fails (and the computation of its
+# batch is stopped).
+QUERY_TIMEOUT = 30.0
+
+# The bounds of the integer arguments of the methods (see
+# ``ARGUMENT_LIMITS``): trial division and sieving up to 10^7, ranges of a
+# million integers or terms, exponents, the arguments of the combinatorial
+# functions, the integers of up to 10 digits whose permutations are
+# generated, of up to 100 digits whose rotations are generated (which costs
+# a cube of the number of digits), and of up to 1000 digits otherwise.
+TRIAL_DIVISION_LIMIT = 10 ** 14
+
+RANGE_LIMIT = 10 ** 6
+
+EXPONENT_LIMIT = 10 ** 4
+
+COMBINATORICS_LIMIT = 10 ** 5
+
+PERMUTATIONS_LIMIT = 10 ** 10
+
+ROTATIONS_LIMIT = 10 ** 100
+
+DIGITS_LIMIT = 10 ** 1000
+
+# The maximum number of arguments of a query, and of elements of a list
+# argument.
+LIST_LIMIT = 10 ** 4
+
+# The bound of the total bit length of the powers of the unreduced sums and
+# products of powers.
+POWER_BITS_LIMIT = 1 << 20
+
+
+METHODS = {
+    # primes
+    'is_prime': is_prime,
+    'prime_factors': lambda n: [[p, e] for p, e in prime_factors(n, multiplicities=True)],
+    # The segmented sieve of the prime mask costs O(sqrt(stop)) for the
+    # sieving primes, instead of a trial division per integer.
+    'primes': lambda start, stop: list(range_mask('prime', range(start, stop))),
+    'is_circular_prime': is_circular_prime,
+    'circular_primes': lambda ubound: list(circular_primes(ubound)),
+    # divisors
+    'divisors': divisors,
+    'd': d,
+    'sigma': sigma,
+    's': s,
+    # arithmetic
+    'additive_persistence': additive_persistence,
+    'binomial': binomial,
+    'binomial2': binomial2,
+    'crt': lambda residues, moduli: list(crt(residues, moduli)),
+    'digit_product': digit_product,
+    'digit_sum': digit_sum,
+    'digits': lambda n, reverse=False: list(digits_(n, reverse=reverse)),
+    'factorial': factorial,
+    'generalised_product': generalised_product,
+    'generalised_sum': generalised_sum,
+    'int_concatenate': int_concatenate,
+    'int_from_digits': int_from_digits,
+    'int_permutations': lambda n: list(int_permutations(n)),
+    'iroot': iroot,
+    'is_pandigital': is_pandigital,
+    'is_perfect_power': is_perfect_power,
+    'is_square': is_square,
+    'isqrt': isqrt,
+    'mod_inverse': mod_inverse,
+    'mod_inverses': mod_inverses,
+    'multinomial': multinomial,
+    'multiplicative_persistence': multiplicative_persistence,
+    'num_digits': num_digits,
+    'power_table': power_table,
+    'product_of_digits': product_of_digits,
+    'rotation': rotation,
+    'rotations': lambda n: list(rotations(n)),
+    'sum_of_digits': sum_of_digits,
+}
+
+
+# The bounds of the absolute values of the integer arguments of the methods,
+# and of the elements of their list arguments, by position, where the last
+# bound applies to any further arguments, and None is no bound. The queries
+# with larger arguments fail straight away, so that no query pins a worker
+# (or the queries coalesced with it). The iterated sums and products of the
+# k-th powers of digits are bounded to k = 1, as for k > 1 they need not
+# reach a single digit (e.g. the sums of the squares of the digits cycle
+# from 4).
+ARGUMENT_LIMITS = {
+    'is_prime': (TRIAL_DIVISION_LIMIT,),
+    'prime_factors': (TRIAL_DIVISION_LIMIT,),
+    'primes': (TRIAL_DIVISION_LIMIT,),
+    'is_circular_prime': (TRIAL_DIVISION_LIMIT,),
+    'circular_primes': (RANGE_LIMIT,),
+    'divisors': (TRIAL_DIVISION_LIMIT, None),
+    'd': (TRIAL_DIVISION_LIMIT, DIGITS_LIMIT),
+    'sigma': (TRIAL_DIVISION_LIMIT, EXPONENT_LIMIT, DIGITS_LIMIT),
+    's': (TRIAL_DIVISION_LIMIT, DIGITS_LIMIT),
+    'additive_persistence': (DIGITS_LIMIT, 1, DIGITS_LIMIT),
+    'binomial': (COMBINATORICS_LIMIT, COMBINATORICS_LIMIT, DIGITS_LIMIT),
+    'binomial2': (COMBINATORICS_LIMIT, COMBINATORICS_LIMIT, DIGITS_LIMIT),
+    'crt': (DIGITS_LIMIT,),
+    'digit_product': (DIGITS_LIMIT, 1, DIGITS_LIMIT),
+    'digit_sum': (DIGITS_LIMIT, 1, DIGITS_LIMIT),
+    'digits': (DIGITS_LIMIT, None),
+    'factorial': (COMBINATORICS_LIMIT,),
+    'generalised_product': (DIGITS_LIMIT, EXPONENT_LIMIT, DIGITS_LIMIT),
+    'generalised_sum': (DIGITS_LIMIT, EXPONENT_LIMIT, DIGITS_LIMIT),
+    'int_concatenate': (DIGITS_LIMIT,),
+    'int_from_digits': (DIGITS_LIMIT,),
+    'int_permutations': (PERMUTATIONS_LIMIT,),
+    'iroot': (DIGITS_LIMIT,),
+    'is_pandigital': (DIGITS_LIMIT, None),
+    'is_perfect_power': (DIGITS_LIMIT,),
+    'is_square': (DIGITS_LIMIT,),
+    'isqrt': (DIGITS_LIMIT,),
+    'mod_inverse': (DIGITS_LIMIT,),
+    'mod_inverses': (DIGITS_LIMIT,),
+    'multinomial': (COMBINATORICS_LIMIT,),
+    'multiplicative_persistence': (DIGITS_LIMIT, 1, DIGITS_LIMIT),
+    'num_digits': (DIGITS_LIMIT,),
+    'power_table': (DIGITS_LIMIT, RANGE_LIMIT, DIGITS_LIMIT),
+    'product_of_digits': (DIGITS_LIMIT, EXPONENT_LIMIT, DIGITS_LIMIT),
+    'rotation': (DIGITS_LIMIT,),
+    'rotations': (ROTATIONS_LIMIT,),
+    'sum_of_digits': (DIGITS_LIMIT, EXPONENT_LIMIT, DIGITS_LIMIT),
+}
+
+
+class QueryError(Exception):
+    """
+    The error of a query which failed on the server.
+    """
+
+
+def _limit_str(limit):
+    # The large limits are powers of 10, e.g. 10^1000.
+    return str(limit) if limit < 10 ** 6 else '10^{}'.format(len(str(limit)) - 1)
+
+
+def _check_value(method, i, value, limit):
+    if isinstance(value, list):
+        if len(value) > LIST_LIMIT:
+            raise QueryError('Argument {} of {} has more than {} elements'.format(i + 1, method, LIST_LIMIT))
+        for v in value:
+            _check_value(method, i, v, limit)
+    elif limit is not None and isinstance(value, (int, float)) and not abs(value) <= limit:
+        raise QueryError('Argument {} of {} exceeds the limit {}'.format(i + 1, method, _limit_str(limit)))
+
+
+def _check_arguments(method, params):
+    """
+    Raises a ``QueryError`` if a query has more than ``LIST_LIMIT``
+    arguments, or a list argument with more than ``LIST_LIMIT`` elements, or
+    if an argument (or element) exceeds its bound in ``ARGUMENT_LIMITS``, or
+    for ``primes`` if the range is longer than ``RANGE_LIMIT``, or for the
+    unreduced ``generalised_sum`` and ``generalised_product`` if the powers
+    have more than ``POWER_BITS_LIMIT`` bits in all.
+    """
+    if len(params) > LIST_LIMIT:
+        raise QueryError('The query of {} has more than {} arguments'.format(method, LIST_LIMIT))
+    limits = ARGUMENT_LIMITS[method]
+    for i, value in enumerate(params):
+        _check_value(method, i, value, limits[min(i, len(limits) - 1)])
+
+    if method == 'primes' and len(params) == 2 and all(isinstance(v, int) for v in params):
+        if params[1] - params[0] > RANGE_LIMIT:
+            raise QueryError('The range of primes exceeds the limit {}'.format(_limit_str(RANGE_LIMIT)))
+    elif method in ('generalised_sum', 'generalised_product') and params and isinstance(params[0], list):
+        k = params[1] if len(params) > 1 else 1
+        mod = params[2] if len(params) > 2 else None
+        if mod is None and isinstance(k, int) and all(isinstance(v, int) for v in params[0]):
+            if sum(v.bit_length() for v in params[0]) * abs(k) > POWER_BITS_LIMIT:
+                raise QueryError('The powers of {} exceed the limit of {} bits'.format(method, POWER_BITS_LIMIT))
+
+
+def _jsonable(value):
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(_jsonable(v) for v in value)
+    return [_jsonable(v) for v in value]
+
+
+def _call(method, params):
+    try:
+        return True, _jsonable(METHODS[method](*params))
+    except Exception as e:
+        return False, '{}: {}'.format(type(e).__name__, e)
+
+
+def _bulk_is_prime(params_list):
+    sieve = prime_sieve(SERVER_SIEVE_SIZE)
+    return [
+        (True, bool(sieve[p[0]])) if len(p) == 1 and type(p[0]) is int and 0 <= p[0] < SERVER_SIEVE_SIZE else
+        _call('is_prime', p)
+        for p in params_list
+    ]
+
+
+# Bulk versions of the methods, which answer a list of queries at once.
+BULK_METHODS = {
+    'is_prime': _bulk_is_prime,
+}
+
+
+def call_batch(method, params_list):
+    """
+    Answers a batch of queries for the given method, in a worker, as a list
+    of pairs (True, result) or (False, error message).
+    """
+    bulk = BULK_METHODS.get(method)
+    if bulk is not None:
+        return bulk(params_list)
+    return [_call(method, params) for params in params_list]
+
+
+def _warm():
+    prime_sieve(SERVER_SIEVE_SIZE)
+
+
+class QueryServer:
+    """
+    The query server, which answers queries with ``query`` (in process) or
+    from connections (see ``start``).
+
+    The queries for each method are collected for ``batch_window`` seconds,
+    or until there are ``max_batch`` of them, and then computed by a single
+    bulk call in the executor: a pool of ``jobs`` worker processes, or a
+    thread if ``jobs`` is 0 (so that the computation shares the caches of
+    the server process).
+
+    The queries with arguments out of bounds (see ``ARGUMENT_LIMITS``) fail
+    straight away, and the others fail if they are not answered within
+    ``timeout`` seconds (None for no timeout), together with the other
+    queries of their batch. If the batch is still being computed by a
+    worker process, the workers are terminated (failing any other batches
+    which they are computing) and replaced, so that the computation does
+    not hold up the later queries. A computation in a thread cannot be
+    stopped, and carries on.
+    """
+    def __init__(self, jobs=None, batch_window=0.001, max_batch=1024, cache_size=1 << 16, timeout=QUERY_TIMEOUT):
+        self.jobs = (os.cpu_count() or 1) if jobs is None else jobs
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.cache = register_cache('server', maxsize=cache_size, maxbytes=1 << 27)
+        self.stats = dict.fromkeys(('requests', 'coalesced', 'batches', 'batched', 'rejected', 'timeouts', 'restarts'), 0)
+        self._executor = None
+        self._in_flight = {}
+        self._batches = {}
+        self._running = {}
+        self._servers = []
+        self._connections = {}
+
+    def _get_executor(self):
+        if self._executor is None:
+            # The tables are built before the workers are started, so that
+            # forked workers inherit them.
+            _warm()
+            if self.jobs:
+                self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+        return self._executor
+
+    async def query(self, method, params=()):
+        """
+        Returns the result of the given method for the given parameters, from
+        the cache, or from a duplicate query in flight, or from a new batch,
+        and raises ``QueryError`` if the query fails.
+        """
+        if method not in METHODS:
+            raise QueryError('Unknown method {!r}'.format(method))
+
+        self.stats['requests'] += 1
+        try:
+            _check_arguments(method, params)
+        except QueryError:
+            self.stats['rejected'] += 1
+            raise
+        key = (method, json.dumps(params))
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self._in_flight[key] = self._enqueue(method, list(params))
+            future.add_done_callback(lambda f: self._settle(key, f))
+        else:
+            self.stats['coalesced'] += 1
+
+        # The future is shared by the coalesced queries, so it must not be
+        # cancelled with one of them (or when one of them times out).
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            self._abort(future)
+            raise QueryError('The query timed out after {} seconds'.format(self.timeout)) from None
+
+    def _abort(self, future):
+        """
+        Fails the batch of the future of a query which timed out, and if the
+        batch is running in the process pool, terminates its workers and
+        drops the pool (a new one is started for the next batch).
+        """
+        for task, (executor, items) in self._running.items():
+            if any(f is future for _, f in items):
+                break
+        else:
+            return
+
+        del self._running[task]
+        error = 'A query of the batch timed out after {} seconds'.format(self.timeout)
+        for _, f in items:
+            if not f.done():
+                f.set_exception(QueryError(error))
+
+        if isinstance(executor, ProcessPoolExecutor) and executor is self._executor:
+            self.stats['restarts'] += 1
+            self._executor = None
+            for process in list(executor._processes.values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _settle(self, key, future):
+        self._in_flight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.cache[key] = future.result()
+
+    def _enqueue(self, method, params):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._batches.get(method)
+        if batch is None:
+            batch = self._batches[method] = ([], loop.call_later(self.batch_window, self._flush, method))
+        batch[0].append((params, future))
+        if len(batch[0]) >= self.max_batch:
+            self._flush(method)
+        return future
+
+    def _flush(self, method):
+        batch = self._batches.pop(method, None)
+        if batch is None:
+            return
+        items, timer = batch
+        timer.cancel()
+        self.stats['batches'] += 1
+        self.stats['batched'] += len(items)
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        task = loop.run_in_executor(executor, call_batch, method, [params for params, _ in items])
+        self._running[task] = (executor, items)
+
+        def distribute(task):
+            self._running.pop(task, None)
+            try:
+                results = task.result()
+            except BaseException as e:
+                results = [(False, '{}: {}'.format(type(e).__name__, e))] * len(items)
+            for (_, future), (ok, value) in zip(items, results):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(QueryError(value))
+
+        task.add_done_callback(distribute)
+
+    async def _respond(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            method = request['method']
+            if method == 'stats':
+                response = {'id': request_id, 'result': dict(self.stats, cache=self.cache.info()._asdict())}
+            else:
+                params = request.get('params', [])
+                if not isinstance(params, list):
+                    raise QueryError('The params must be a list')
+                response = {'id': request_id, 'result': await self.query(method, params)}
+        except (QueryError, ValueError, KeyError, TypeError, AttributeError) as e:
+            response = {'id': request_id, 'error': str(e) if isinstance(e, QueryError) else 'Invalid request: {}'.format(e)}
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        self._connections[asyncio.current_task()] = writer
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(json.dumps({'id': None, 'error': 'Request line too long'}).encode() + b'\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                if len(tasks) >= MAX_IN_FLIGHT:
+                    await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            self._connections.pop(asyncio.current_task(), None)
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        """
+        Starts listening on the given TCP host and port, or on the Unix
+        socket with the given path, and returns the ``asyncio.Server``.
+        """
+        self._get_executor()
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle_connection, path=path, limit=LINE_LIMIT)
+        else:
+            server = await asyncio.start_server(self._handle_connection, host=host, port=port, limit=LINE_LIMIT)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers.clear()
+        # Closing the connections ends their handlers (at the end of input).
+        connections = list(self._connections.items())
+        for _, writer in connections:
+            writer.close()
+        if connections:
+            await asyncio.wait([task for task, _ in connections])
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def serve(host='127.0.0.1', port=DEFAULT_PORT, path=None, **kwargs):
+    """
+    Runs a ``QueryServer`` (with the given keyword arguments) on the given
+    TCP host and port, or Unix socket path, until it is interrupted.
+    """
+    async def main():
+        query_server = QueryServer(**kwargs)
+        server = await query_server.start(host=host, port=port, path=path)
+        try:
+            await server.serve_forever()
+        finally:
+            await query_server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class Client:
+    """
+    An async client of the query server, on which queries can be made
+    concurrently (they are pipelined on the one connection), e.g.
+
+        >>> client = await Client.connect(path='/tmp/inttools.sock')
+        >>> await asyncio.gather(*(client.call('sigma', n, 1) for n in range(1, 100)))
+        >>> await client.close()
+    """
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._pending = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        """
+        Connects to the server on the given TCP host and port, or on the Unix
+        socket with the given path.
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=LINE_LIMIT)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._pending.pop(response.get('id'), None)
+                if future is None or future.done():
+                    continue
+                if 'error' in response:
+                    future.set_exception(QueryError(response['error']))
+                else:
+                    future.set_result(response['result'])
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('The connection to the server was closed'))
+            self._pending.clear()
+
+    async def call(self, method, *params):
+        """
+        Returns the result of the given method for the given parameters, and
+        raises ``QueryError`` if the query fails on the server.
+        """
+        if self._receiver.done():
+            raise ConnectionError('The connection to the server was closed')
+        request_id = next(self._ids)
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        self._writer.write(json.dumps({'id': request_id, 'method': method, 'params': params}).encode() + b'\n')
+        await self._writer.drain()
+        return await future
+
+    async def stats(self):
+        """
+        Returns the statistics of the server: the numbers of requests,
+        coalesced requests, batches and batched requests, and the statistics
+        of the result cache.
+        """
+        return await self.call('stats')
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._receiver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
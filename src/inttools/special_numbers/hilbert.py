@@ -1,5 +1,16 @@
 import math
 
+from itertools import compress
+
+from inttools.arithmetic import (
+    is_square,
+    is_square_batch,
+    isqrt,
+    isqrt_batch,
+)
+from inttools.sequences import ArithmeticProgression
+from inttools.utils.profiling import profiled
+
 
 def is_hilbert_number(n):
     """
@@ -18,15 +29,27 @@ def is_hilbert_square(n):
 
         n = (4k + 1)^2 = 16k^2 + 8k + 1 = 4[4k^2 + 2k] + 1
 
-    for some positive integer k. Solving for k the positive solution is
+    for some non-negative integer k, so to check whether a given n is a
+    Hilbert square we simply need to check that it is a perfect square whose
+    (exact integer) square root is 1 mod 4.
+    """
+    return is_square(n) and isqrt(n) % 4 == 1
 
-        (-1 + sqrt(n)) / 4
 
-    and to check whether a given n is a Hilbert square we simpy need to check
-    that this is an integer.
-    
+def is_hilbert_square_batch(values):
     """
-    return ((-1 + math.sqrt(n)) / 4).is_integer()
+    Batch version of ``is_hilbert_square`` for an array (or any sequence) of
+    integers, which returns a boolean array (or a list if NumPy is not
+    installed).
+    """
+    squares = is_square_batch(values)
+    if isinstance(squares, list):
+        return [s and isqrt(int(n)) % 4 == 1 for s, n in zip(squares, values)]
+
+    import numpy as np
+
+    squares[squares] = isqrt_batch(np.asarray(values)[squares]) % 4 == 1
+    return squares
 
 
 def is_hilbert_squarefree_number(n):
@@ -37,11 +60,16 @@ def is_hilbert_squarefree_number(n):
     Note: the given n need not be a Hilbert number but could be any positive
     integer.
 
+    Only the Hilbert squares (4k + 1)^2 <= n (for k > 0) need to be tested
+    as divisors.
     """
-    ubound = math.ceil(n / 2)
-    for a in range(5, ubound + 1):
-        if is_hilbert_square(a) and n % a == 0:
+    if n < 1:
+        return False
+    m = 5
+    while m * m <= n:
+        if n % (m * m) == 0:
             return False
+        m += 4
     return True
 
 
@@ -57,36 +85,293 @@ def is_squarefree_hilbert_number(n):
     return is_hilbert_number(n) and is_hilbert_squarefree_number(n)
 
 
+HILBERT_SIEVE_SEGMENT_SIZE = 1 << 20
+
+# The step of a range above which its elements are sieved as a progression
+# (see ``_hilbert_squarefree_progression_sieve``) rather than by sieving the
+# interval it spans.
+HILBERT_SIEVE_STEP_LIMIT = 16
+
+
+def _hilbert_squarefree_sieve_counters(flags, stop, start=1):
+    return {'sieve_segments': 1, 'sieving_squares': len(range(5, isqrt(max(stop - 1, 0)) + 1, 4))}
+
+
+@profiled('hilbert_squarefree_sieve', tier='sieve', counters=_hilbert_squarefree_sieve_counters)
+def hilbert_squarefree_sieve(stop, start=1):
+    """
+    Returns a bytearray of flags for the integers n in the interval
+    [start, stop) where the flag at index n - start is 1 if n is a Hilbert
+    squarefree number and 0 otherwise, e.g.
+
+        (101, 1) -> 0 at the indices 24, 49, 74, 80, 99 (for the multiples
+                    25, 50, 75, 81, 100 of Hilbert squares), otherwise 1
+
+    The multiples of each Hilbert square (4k + 1)^2 < stop (for k > 0) are
+    marked directly in the bytearray, so that this takes O(N) steps for an
+    interval of length N, and the interval need not start at 1.
+    """
+    size = max(stop - start, 0)
+    flags = bytearray(b'\x01') * size
+    if start < 1:
+        flags[:min(1 - start, size)] = bytes(min(1 - start, size))
+
+    m = 5
+    while m * m < stop:
+        q = m * m
+        first = max(-(-start // q) * q, q) - start
+        if first < size:
+            flags[first::q] = bytes(len(range(first, size, q)))
+        m += 4
+
+    return flags
+
+
+def _hilbert_squarefree_progression_sieve(int_range):
+    """
+    Returns a bytearray of the Hilbert squarefree flags of the elements of
+    an increasing range, where the multiples of each Hilbert square
+    q = (4k + 1)^2 (for k > 0) up to the largest element are marked directly
+    by their indices, starting from the least solution i of
+    a + id = 0 (mod q), so that this takes O(sqrt(N) + n) steps for n
+    elements up to N, however far apart they are.
+    """
+    a, d, length = int_range.start, int_range.step, len(int_range)
+    flags = bytearray(b'\x01') * length
+    nonpositive = min(length, max(0, -(-(1 - a) // d)))
+    flags[:nonpositive] = bytes(nonpositive)
+
+    hi = int_range[-1] if length else 0
+    m = 5
+    while m * m <= hi:
+        q = m * m
+        g = math.gcd(d, q)
+        if a % g == 0:
+            r = q // g
+            i = (-(a // g)) * pow(d // g, -1, r) % r if r > 1 else 0
+            if i < length:
+                flags[i::r] = bytes(len(range(i, length, r)))
+        m += 4
+
+    return flags
+
+
+def _hilbert_squarefree_windows(int_range):
+    """
+    Generates pairs of consecutive sub-ranges of the given range and the
+    bytearray of Hilbert squarefree flags for their elements (in order), by
+    sieving segments of the interval spanned by the range, or for a range
+    with a step above ``HILBERT_SIEVE_STEP_LIMIT`` by sieving sub-ranges of
+    ``HILBERT_SIEVE_SEGMENT_SIZE`` elements as progressions, so that the
+    windows are sized by their numbers of elements rather than their spans.
+    """
+    step = int_range.step
+    if abs(step) > HILBERT_SIEVE_STEP_LIMIT:
+        for i in range(0, len(int_range), HILBERT_SIEVE_SEGMENT_SIZE):
+            sub = int_range[i:i + HILBERT_SIEVE_SEGMENT_SIZE]
+            if step > 0:
+                yield sub, _hilbert_squarefree_progression_sieve(sub)
+            else:
+                yield sub, _hilbert_squarefree_progression_sieve(sub[::-1])[::-1]
+        return
+
+    chunk = max(1, HILBERT_SIEVE_SEGMENT_SIZE // abs(step))
+
+    for i in range(0, len(int_range), chunk):
+        sub = int_range[i:i + chunk]
+        lo, hi = min(sub[0], sub[-1]), max(sub[0], sub[-1])
+        flags = hilbert_squarefree_sieve(hi + 1, start=lo)
+        yield sub, flags[sub[0] - lo::step]
+
+
+def _hilbert_range(int_range):
+    """
+    Returns the range of Hilbert numbers in the given range, in the same
+    order.
+    """
+    hilbert = ArithmeticProgression(1, 4).within(int_range)
+    if int_range.step < 0:
+        hilbert = hilbert[::-1]
+    return range(hilbert.a, hilbert.a + len(hilbert) * hilbert.d, hilbert.d) if hilbert else range(0)
+
+
 def hilbert_numbers(int_range):
-    for n in int_range:
-        if is_hilbert_number(n):
-            yield n
+    """
+    Generates the Hilbert numbers in the given range, in the order of the
+    range, by iterating over the residue class 1 mod 4 directly rather than
+    filtering the range.
+    """
+    yield from _hilbert_range(int_range)
+
+
+def _hilbert_square_roots(int_range):
+    """
+    Returns the (ascending) range of Hilbert numbers whose squares lie
+    between the bounds of the given range.
+    """
+    if not int_range:
+        return range(0)
+
+    lo, hi = min(int_range[0], int_range[-1]), max(int_range[0], int_range[-1])
+    if hi < 1:
+        return range(0)
+
+    m0 = isqrt(lo - 1) + 1 if lo > 1 else 1
+    m0 += (1 - m0) % 4
+    m1 = isqrt(hi)
+    m1 -= (m1 - 1) % 4
+    return range(m0, m1 + 1, 4)
 
 
 def hilbert_squares(int_range):
-    for n in int_range:
-        if is_hilbert_square(n):
-            yield n
+    """
+    Generates the Hilbert squares in the given range, in the order of the
+    range, by iterating over the Hilbert numbers between the square roots
+    of its bounds.
+    """
+    ms = _hilbert_square_roots(int_range)
+    start, step = int_range.start, int_range.step
+
+    for m in (ms if step > 0 else reversed(ms)):
+        if (m * m - start) % step == 0:
+            yield m * m
+
+
+def _hilbert_squares_count(int_range):
+    """
+    Counts the Hilbert squares in the given range. For a range of step 1 this
+    is the number of Hilbert numbers between the square roots of its bounds,
+    and otherwise the squares of the roots are periodic modulo the step,
+    so only one period of the roots needs to be checked.
+    """
+    ms = _hilbert_square_roots(int_range)
+    start, step = int_range.start, abs(int_range.step)
+    if step == 1:
+        return len(ms)
+
+    period = step // math.gcd(4, step)
+    if len(ms) <= period:
+        return sum(1 for m in ms if (m * m - start) % step == 0)
+
+    q, r = divmod(len(ms), period)
+    hits = [(m * m - start) % step == 0 for m in ms[:period]]
+    return q * sum(hits) + sum(hits[:r])
+
+
+def _hilbert_squarefree_coefficients(L):
+    """
+    Returns the list of pairs (k, c(k)), for 1 <= k <= L and c(k) != 0, of
+    the coefficients in the inclusion-exclusion count of Hilbert squarefree
+    numbers
+
+        #{n in S : n is Hilbert squarefree} = sum c(k) #{n in S : k^2 | n}
+
+    for a set S of positive integers (bounded by L^2).
+
+    Writing a positive integer as n = K^2 m, with m squarefree, n is Hilbert
+    squarefree if and only if K has no divisor d = 1 mod 4 with d > 1, i.e.
+    h(K) = 1, where h is the indicator of the numbers 2^a and 2^a q, with q a
+    prime = 3 mod 4. By Moebius inversion c = mu * h (Dirichlet convolution),
+    which is computed here by sieving in O(L log log L) steps.
+    """
+    is_prime = bytearray(b'\x01') * (L + 1)
+    is_prime[:2] = bytes(min(2, L + 1))
+    mu = [1] * (L + 1)
+    for p in range(2, L + 1):
+        if is_prime[p]:
+            is_prime[p * p::p] = bytes(len(range(p * p, L + 1, p)))
+            for m in range(p, L + 1, p):
+                mu[m] = -mu[m]
+            for m in range(p * p, L + 1, p * p):
+                mu[m] = 0
+
+    support = []
+    t = 1
+    while t <= L:
+        support.append(t)
+        support.extend(t * q for q in range(3, L // t + 1, 4) if is_prime[q])
+        t *= 2
+
+    c = [0] * (L + 1)
+    for j in support:
+        for t, k in enumerate(range(j, L + 1, j), start=1):
+            c[k] += mu[t]
+
+    return [(k, ck) for k, ck in enumerate(c) if ck and k]
+
+
+def _multiples_count(a, d, length, q):
+    """
+    Counts the multiples of q among the terms a, a + d, ..., a + (length - 1)d
+    of a bounded arithmetic progression (with d > 0).
+    """
+    g = math.gcd(d, q)
+    if a % g:
+        return 0
+    m = q // g
+    i0 = (-(a // g)) * pow(d // g, -1, m) % m if m > 1 else 0
+    return (length - 1 - i0) // m + 1 if i0 < length else 0
+
+
+def _hilbert_squarefree_count(ap):
+    """
+    Counts the Hilbert squarefree numbers in an increasing, bounded
+    arithmetic progression of positive integers, by inclusion-exclusion over
+    the squares k^2 <= L^2 of its largest term, which takes about O(L) steps.
+    Only progressions spanning an interval no longer than L are sieved
+    instead.
+    """
+    if not ap:
+        return 0
+
+    a, d, length = ap.a, ap.d, len(ap)
+    hi = a + (length - 1) * d
+    L = isqrt(hi)
+
+    if hi - a <= L:
+        windows = _hilbert_squarefree_windows(range(a, hi + 1, d))
+        return sum(flags.count(1) for _, flags in windows)
+
+    if d == 1:
+        return sum(ck * (hi // (k * k) - (a - 1) // (k * k)) for k, ck in _hilbert_squarefree_coefficients(L))
+
+    return sum(ck * _multiples_count(a, d, length, k * k) for k, ck in _hilbert_squarefree_coefficients(L))
 
 
 def hilbert_squarefree_numbers(int_range):
-    for n in int_range:
-        if is_hilbert_squarefree_number(n):
-            yield n
+    """
+    Generates the Hilbert squarefree numbers in the given range, in the order
+    of the range, using a segmented sieve.
+    """
+    for sub, flags in _hilbert_squarefree_windows(int_range):
+        yield from compress(sub, flags)
 
 
 def squarefree_hilbert_numbers(int_range):
-    for n in int_range:
-        if is_squarefree_hilbert_number(n):
-            yield n
+    """
+    Generates the squarefree Hilbert numbers in the given range, in the order
+    of the range, using a segmented sieve over the Hilbert numbers in the
+    range.
+    """
+    yield from hilbert_squarefree_numbers(_hilbert_range(int_range))
 
 
+@profiled('hcount', tier=lambda count, number_type, int_range: number_type)
 def hcount(number_type, int_range):
+    """
+    Counts the numbers of the given type - one of 'hilbert', 'hilbert square',
+    'hilbert squarefree' or 'squarefree hilbert' - in the given range, which
+    may have any step.
+
+    The Hilbert numbers and Hilbert squares are counted in O(1) steps (for
+    ranges of step 1), and the squarefree types in about O(sqrt N) steps, for
+    a range bounded by N, by inclusion-exclusion over the Hilbert squares.
+    """
     if number_type == 'hilbert':
-        return sum(1 for n in hilbert_numbers(int_range))
+        return len(_hilbert_range(int_range))
     elif number_type == 'hilbert square':
-        return sum(1 for n in hilbert_squares(int_range))
+        return _hilbert_squares_count(int_range)
     elif number_type == 'hilbert squarefree':
-        return sum(1 for n in hilbert_squarefree_numbers(int_range))
+        return _hilbert_squarefree_count(ArithmeticProgression(1, 1).within(int_range))
     elif number_type == 'squarefree hilbert':
-        return sum(1 for n in squarefree_hilbert_numbers(int_range))
+        return _hilbert_squarefree_count(ArithmeticProgression(1, 4).within(int_range))
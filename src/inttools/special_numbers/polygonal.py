@@ -1,14 +1,20 @@
-import math
-
 from functools import partial
 
+from inttools.arithmetic import (
+    is_square,
+    is_square_batch,
+    isqrt,
+    isqrt_batch,
+)
+
+
 def polygonal_number(n, k):
     """
         Returns the kth n-gonal number P(n, k) given by the general formula:
             P(s, n)
             P(n, k) = [(n - 2)k^2 - (n - 4)k] / 2
     """
-    return int(((n - 2) * k ** 2 - (n - 4) * k) / (2))
+    return ((n - 2) * k ** 2 - (n - 4) * k) // 2
 
 
 def n_polygonal_number_func(n):
@@ -37,8 +43,141 @@ def is_polygonal_number(m, n):
         Checks whether a given number m is a polygonal number for some n, i.e.
         whether it is an n-gonal number for some n > 2. If so, it returns the
         index of the number in the sequence, otherwise it returns null.
+
+        The index k is the positive root of (n - 2)k^2 - (n - 4)k - 2m = 0,
+
+            k = [(n - 4) + sqrt((n - 4)^2 + 8m(n - 2))] / 2(n - 2)
+
+        which is computed exactly, by checking that the discriminant is a
+        perfect square and that the numerator is divisible by 2(n - 2).
+    """
+    D = (n - 4) ** 2 + 8 * m * (n - 2)
+    if not is_square(D):
+        return False
+    k, r = divmod((n - 4) + isqrt(D), 2 * (n - 2))
+    return k if r == 0 and k > 0 else False
+
+
+def is_polygonal_number_batch(values, sides):
+    """
+        Batch version of ``is_polygonal_number`` which classifies an array
+        (or any sequence) of numbers against many side counts at once. It
+        returns a 2D array whose (i, j)-th entry is the index of the i-th
+        number as a polygonal number with the j-th side count, or 0 if it is
+        not one, e.g.
+
+            [1, 6, 9, 10], [3, 4] -> [[1, 1], [3, 0], [0, 3], [4, 0]]
+
+        The discriminants are checked in bulk with ``is_square_batch``, in
+        64-bit integers where they fit, otherwise with Python ints.
+
+        NumPy is an optional dependency: if it is not installed a list of
+        lists is returned.
+    """
+    if any(n < 3 for n in sides):
+        raise ValueError('The side counts must be integers greater than 2')
+
+    try:
+        import numpy as np
+    except ImportError:
+        return [[is_polygonal_number(m, n) or 0 for n in sides] for m in values]
+
+    m = np.asarray(values)
+    n = np.asarray(sides)
+    if m.size and n.size and max(abs(int(m.max())), abs(int(m.min()))) * 8 * int(n.max()) < 2 ** 62:
+        m, n = m.astype(np.int64), n.astype(np.int64)
+    else:
+        m, n = m.astype(object), n.astype(object)
+
+    m, n = m.reshape(-1, 1), n.reshape(1, -1)
+    D = (n - 4) ** 2 + 8 * m * (n - 2)
+    N = np.broadcast_to(n, D.shape)
+
+    squares = is_square_batch(D)
+    num = (N[squares] - 4) + isqrt_batch(D[squares])
+    den = 2 * (N[squares] - 2)
+    k, r = num // den, num % den
+
+    indices = np.zeros(D.shape, dtype=np.int64 if D.dtype != object else object)
+    indices[squares] = np.where((r == 0) & (k > 0), k, 0)
+    return indices
+
+
+def _polygonal_floor_index(n, m):
+    """
+        Returns the largest index k >= 0 such that the k-th n-gonal number
+        is at most m, using the exact integer square root of the
+        discriminant of P(n, k) = m.
     """
-    if m == 1:
-        return True
-    k = (((n - 4) + math.sqrt((n - 4) ** 2 + 8 * m * (n - 2))) / (2 * (n - 2)))
-    return int(k) if k.is_integer() else False
+    if m < 1:
+        return 0
+    return ((n - 4) + isqrt((n - 4) ** 2 + 8 * m * (n - 2))) // (2 * (n - 2))
+
+
+def polygonal_index_range(n, digits=None, int_range=None):
+    """
+        Returns the range of indices k of the n-gonal numbers P(n, k) which
+        have the given number of (decimal) digits, or which lie in the given
+        range (of step 1), e.g.
+
+            (3, 2)                     -> range(4, 14)
+            (5, None, range(100, 200)) -> range(9, 12)
+    """
+    if digits is not None:
+        int_range = range(10 ** (digits - 1), 10 ** digits)
+
+    return range(
+        _polygonal_floor_index(n, int_range.start - 1) + 1,
+        _polygonal_floor_index(n, int_range.stop - 1) + 1
+    )
+
+
+def polygonal_numbers(n, digits=None, int_range=None):
+    """
+        Generates the n-gonal numbers, by default. Can also generate the
+        n-gonal numbers with a given number of (decimal) digits, by using the
+        'digits' option, or in a given interval (of step 1), by using the
+        'int_range' option, in which case the bounds of the indices are
+        computed exactly, e.g.
+
+            (4, 2) -> 16, 25, 36, 49, 64, 81
+    """
+    if digits is not None or int_range is not None:
+        for k in polygonal_index_range(n, digits=digits, int_range=int_range):
+            yield polygonal_number(n, k)
+        return
+
+    k = 1
+    while True:
+        yield polygonal_number(n, k)
+        k += 1
+
+
+def polygonal_digit_index(sides, digits, d):
+    """
+        Returns a pair of dicts indexing the n-gonal numbers with the given
+        number of digits, for all the given side counts n, by their leading
+        and trailing ``d`` digits respectively. The values are lists of pairs
+        (n, number), e.g.
+
+            >>> prefixes, suffixes = polygonal_digit_index([3, 4, 5], 4, 2)
+
+            >>> prefixes[81]
+            >>> [(3, 8128), (4, 8100), (5, 8177)]
+
+            >>> suffixes[81]
+            >>> [(3, 1081), (3, 3081), (3, 7381), (4, 1681), (4, 3481), (4, 8281)]
+
+        This turns searches for chains of numbers where the trailing digits
+        of one number are the leading digits of the next into lookups.
+    """
+    prefixes = {}
+    suffixes = {}
+    p = 10 ** (digits - d)
+    q = 10 ** d
+    for n in sides:
+        for m in polygonal_numbers(n, digits=digits):
+            prefixes.setdefault(m // p, []).append((n, m))
+            suffixes.setdefault(m % q, []).append((n, m))
+
+    return prefixes, suffixes
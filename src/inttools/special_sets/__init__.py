@@ -1,2 +1,3 @@
 from .cyclic import *
-from .polygonal import *
\ No newline at end of file
+from .polygonal import *
+from .masks import *
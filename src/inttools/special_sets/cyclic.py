@@ -1,6 +1,3 @@
-from itertools import permutations
-
-
 def is_d_cyclic_set(int_set, d):
     """
         Checks whether a given set (or sequence) of positive integers has the
@@ -14,9 +11,99 @@ def is_d_cyclic_set(int_set, d):
             8128, 2882, 8281
 
         has the 2-cyclic property.
+
+        The integers are stringified once to build the graph with an edge
+        from x to y if the d least significant digits of x are the d most
+        significant digits of y, and the set is d-cyclic if this graph has a
+        Hamiltonian cycle. This is decided by dynamic programming over the
+        subsets of the integers (as bitmasks), in O(2^m m^2) steps for a set
+        of m integers, instead of trying all m! permutations.
+    """
+    strs = [str(n) for n in int_set]
+    m = len(strs)
+    if m == 0:
+        return True
+
+    # succ[i] is the bitmask of the integers which can follow the i-th.
+    succ = [0] * m
+    for i, s in enumerate(strs):
+        for j, t in enumerate(strs):
+            if i != j and s[-d:] == t[:d]:
+                succ[i] |= 1 << j
+    if m == 1:
+        return strs[0][-d:] == strs[0][:d]
+
+    # ends[mask] is the bitmask of the integers in which a path starting at
+    # the 0-th integer and visiting exactly the integers in mask can end.
+    full = (1 << m) - 1
+    ends = [0] * (1 << m)
+    ends[1] = 1
+    for mask in range(1, full + 1, 2):
+        e = ends[mask]
+        while e:
+            i = (e & -e).bit_length() - 1
+            e &= e - 1
+            nxt = succ[i] & ~mask
+            while nxt:
+                j = nxt & -nxt
+                nxt ^= j
+                ends[mask | j] |= j
+
+    closing = [i for i in range(m) if succ[i] & 1]
+    return any(ends[full] >> i & 1 for i in closing)
+
+
+def d_cyclic_sets(pools, d):
     """
-    m = len(int_set)
-    for p in permutations(int_set):
-        if all(str(p[i])[-d:] == str(p[(i + 1) % m])[:d] for i in range(m)):
-            return True
-    return False
+        Generates all the d-cyclic sets (see ``is_d_cyclic_set``) which
+        consist of one integer from each of the given candidate pools, as
+        tuples of distinct integers in cyclic order starting with the
+        integer from the first pool, e.g. for the 4-digit triangular, square
+        and pentagonal numbers
+
+            >>> pools = [polygonal_numbers(n, digits=4) for n in (3, 4, 5)]
+
+            >>> list(d_cyclic_sets(pools, 2))
+            >>> [(8128, 2882, 8281)]
+
+        The cycles are found by backtracking over an index of the integers
+        by their d most significant digits, with a branch pruned as soon as
+        none of the unused pools contains an integer which could close the
+        cycle. Each set is generated only once, even if its integers occur
+        in more than one pool.
+    """
+    pools = [list(pool) for pool in pools]
+    m = len(pools)
+    if m == 0:
+        return
+
+    prefixes = {}
+    closers = {}
+    for k, pool in enumerate(pools):
+        for n in pool:
+            s = str(n)
+            prefixes.setdefault(s[:d], []).append((k, n, s))
+            closers.setdefault(s[-d:], set()).add(k)
+
+    seen = set()
+    full = (1 << m) - 1
+
+    def extend(path, used, last, head):
+        if used == full:
+            if last[-d:] == head and frozenset(path) not in seen:
+                seen.add(frozenset(path))
+                yield tuple(path)
+            return
+
+        if not any(not used >> k & 1 for k in closers.get(head, ())):
+            return
+
+        for k, n, s in prefixes.get(last[-d:], ()):
+            if not used >> k & 1 and n not in path:
+                path.append(n)
+                yield from extend(path, used | 1 << k, s, head)
+                path.pop()
+
+    for n in pools[0]:
+        s = str(n)
+        yield from extend([n], 1, s, s[:d])
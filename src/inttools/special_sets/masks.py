@@ -0,0 +1,383 @@
+from bisect import bisect_right
+from itertools import (
+    compress,
+    islice,
+)
+
+from inttools.arithmetic import (
+    is_square,
+    is_square_batch,
+    isqrt,
+)
+from inttools.primes import (
+    is_circular_prime,
+    is_prime,
+    prime_sieve,
+)
+from inttools.special_numbers import (
+    hilbert_squarefree_numbers,
+    is_hilbert_number,
+    is_hilbert_square,
+    is_hilbert_square_batch,
+    is_hilbert_squarefree_number,
+    is_polygonal_number,
+    is_polygonal_number_batch,
+    is_squarefree_hilbert_number,
+    polygonal_index_range,
+    polygonal_numbers,
+)
+
+
+# Translation tables between flag bytes (zero or non-zero) and the ASCII
+# binary digits of the packed bits.
+_FLAGS_TO_BINARY = bytes([48] + [49] * 255)
+
+_BINARY_TO_FLAGS = bytes.maketrans(b'01', b'\x00\x01')
+
+# The maximum length of the intervals sieved at a time for a mask, and the
+# step of a range above which its elements are tested one by one instead of
+# sieving the intervals between them.
+MASK_SEGMENT_SIZE = 1 << 20
+
+MASK_SPARSE_STEP = MASK_SEGMENT_SIZE >> 4
+
+
+class RangeMask:
+    """
+        The subset of a range of integers which satisfy some property, stored
+        as a packed bit array (a Python int whose bit i is set if the i-th
+        element of the range is in the subset), e.g.
+
+            >>> m = range_mask('hilbert', range(20)) & range_mask('prime', range(20))
+            >>> m, len(m), list(m)
+            >>> (RangeMask(range(0, 20), [5, 13, 17]), 3, [5, 13, 17])
+
+        Masks over the same range support the set operations & (and), |
+        (or), ^ (xor), - (and not) and ~ (the complement in the range),
+        which are single big-integer operations. The members can be counted
+        (``len`` or ``popcount``), iterated over in the order of the range,
+        and tested (``in``), and the mask can be converted to and from a
+        NumPy bool array (``to_numpy``, ``from_flags``).
+    """
+    __slots__ = ('range', 'bits')
+
+    def __init__(self, int_range, bits=0):
+        self.range = int_range
+        self.bits = bits & ((1 << len(int_range)) - 1)
+
+    @classmethod
+    def from_flags(cls, int_range, flags):
+        """
+            Returns the mask for a sequence of flags for the elements of the
+            range: a bytes-like object (of zero or non-zero bytes), a NumPy
+            bool (or integer) array, or any iterable of truth values.
+        """
+        if len(flags) != len(int_range):
+            raise ValueError('There must be one flag per element of the range')
+        if not isinstance(flags, (bytes, bytearray, memoryview)):
+            try:
+                flags = flags.astype(bool).tobytes()
+            except AttributeError:
+                flags = bytes(map(bool, flags))
+        if not flags:
+            return cls(int_range)
+        return cls(int_range, int(bytes(flags).translate(_FLAGS_TO_BINARY)[::-1], 2))
+
+    @classmethod
+    def from_predicate(cls, int_range, predicate):
+        """
+            Returns the mask of the elements of the range which satisfy the
+            given predicate, by evaluating it on each element.
+        """
+        return cls.from_flags(int_range, bytes(bool(predicate(n)) for n in int_range))
+
+    def flags(self):
+        """
+            Returns the flags of the elements of the range as a bytes object,
+            with 1 for the members and 0 otherwise.
+        """
+        n = len(self.range)
+        if not n:
+            return b''
+        return format(self.bits, '0{}b'.format(n))[::-1].encode().translate(_BINARY_TO_FLAGS)
+
+    def to_numpy(self):
+        """
+            Returns the mask as a NumPy bool array (NumPy is required).
+        """
+        import numpy as np
+
+        return np.frombuffer(bytearray(self.flags()), dtype=bool)
+
+    def popcount(self):
+        return self.bits.bit_count()
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __iter__(self):
+        return compress(self.range, self.flags())
+
+    def __contains__(self, n):
+        return n in self.range and bool(self.bits >> self.range.index(n) & 1)
+
+    def __repr__(self):
+        members = list(self) if len(self) <= 10 else '{} members'.format(len(self))
+        return 'RangeMask({!r}, {})'.format(self.range, members)
+
+    def _other(self, other):
+        if not isinstance(other, RangeMask):
+            return NotImplemented
+        if other.range != self.range:
+            raise ValueError('The masks are over different ranges')
+        return other.bits
+
+    def __eq__(self, other):
+        if not isinstance(other, RangeMask):
+            return NotImplemented
+        return self.range == other.range and self.bits == other.bits
+
+    __hash__ = None
+
+    def __and__(self, other):
+        bits = self._other(other)
+        return bits if bits is NotImplemented else RangeMask(self.range, self.bits & bits)
+
+    def __or__(self, other):
+        bits = self._other(other)
+        return bits if bits is NotImplemented else RangeMask(self.range, self.bits | bits)
+
+    def __xor__(self, other):
+        bits = self._other(other)
+        return bits if bits is NotImplemented else RangeMask(self.range, self.bits ^ bits)
+
+    def __sub__(self, other):
+        bits = self._other(other)
+        return bits if bits is NotImplemented else RangeMask(self.range, self.bits & ~bits)
+
+    def __invert__(self):
+        return RangeMask(self.range, ~self.bits)
+
+
+def _span(int_range):
+    """
+        Returns the bounds [lo, hi) of the interval spanned by a non-empty
+        range, and the slice of it which gives the elements of the range.
+    """
+    lo, hi = min(int_range[0], int_range[-1]), max(int_range[0], int_range[-1]) + 1
+    return lo, hi, slice(int_range[0] - lo, None, int_range.step)
+
+
+def _interval_mask(int_range, interval_flags, element_flags):
+    """
+        Returns the mask of a range from a function which returns the flags
+        of the integers in an interval [lo, hi), applied to consecutive
+        sub-ranges each spanning at most ``MASK_SEGMENT_SIZE`` integers, so
+        that the buffers are bounded whatever the span of the range. For a
+        range with a step above ``MASK_SPARSE_STEP`` (or if there is no
+        interval function) the flags are instead computed by a function
+        which returns the flags of the elements of sub-ranges of
+        ``MASK_SEGMENT_SIZE`` elements.
+    """
+    if not int_range:
+        return RangeMask(int_range)
+    step = abs(int_range.step)
+    if interval_flags is None or step > MASK_SPARSE_STEP:
+        chunk, interval_flags = MASK_SEGMENT_SIZE, None
+    else:
+        chunk = max(1, MASK_SEGMENT_SIZE // step)
+
+    flags = bytearray()
+    for i in range(0, len(int_range), chunk):
+        sub = int_range[i:i + chunk]
+        if interval_flags is None:
+            flags += element_flags(sub)
+        else:
+            lo, hi, s = _span(sub)
+            flags += interval_flags(lo, hi)[s]
+    return RangeMask.from_flags(int_range, flags)
+
+
+def _values_mask(int_range, values):
+    """
+        Returns the mask of the elements of a range which are in an iterable
+        of values.
+    """
+    flags = bytearray(len(int_range))
+    for n in values:
+        if n in int_range:
+            flags[int_range.index(n)] = 1
+    return RangeMask.from_flags(int_range, flags)
+
+
+def _sieving_primes(r):
+    """
+        Generates the primes up to r, from the (cached) sieve of the
+        integers up to r if r is below ``MASK_SEGMENT_SIZE``, or else from
+        segmented sieves of ``MASK_SEGMENT_SIZE`` integers at a time.
+    """
+    if r < MASK_SEGMENT_SIZE:
+        yield from compress(range(r + 1), prime_sieve(r + 1))
+        return
+    for lo in range(0, r + 1, MASK_SEGMENT_SIZE):
+        hi = min(lo + MASK_SEGMENT_SIZE, r + 1)
+        yield from compress(range(lo, hi), _prime_flags(lo, hi))
+
+
+def _prime_flags(lo, hi):
+    """
+        Returns the prime flags for the integers in the interval [lo, hi)
+        using a segmented sieve of Eratosthenes, with the primes up to
+        sqrt(hi), so that the interval need not start at 0.
+    """
+    size = hi - lo
+    flags = bytearray(b'\x01') * size
+    flags[:max(0, min(2 - lo, size))] = bytes(max(0, min(2 - lo, size)))
+    for p in _sieving_primes(isqrt(max(hi - 1, 0))):
+        first = max(p * p, -(-lo // p) * p) - lo
+        if first < size:
+            flags[first::p] = bytes(len(range(first, size, p)))
+    return flags
+
+
+def _hilbert_flags(lo, hi):
+    flags = bytearray(hi - lo)
+    first = max(lo, 1)
+    first += (1 - first) % 4
+    if first < hi:
+        flags[first - lo::4] = b'\x01' * len(range(first, hi, 4))
+    return flags
+
+
+def _prime_element_flags(int_range):
+    """
+        Returns the prime flags of the elements of a range, by trial division
+        by the primes up to the square root of each element, or with
+        ``is_prime`` for elements whose sieving primes are not below
+        ``MASK_SEGMENT_SIZE``.
+    """
+    r = isqrt(max(int_range[0], int_range[-1], 0))
+    if r >= MASK_SEGMENT_SIZE:
+        return bytes(map(is_prime, int_range))
+    base = list(_sieving_primes(r))
+    return bytes(
+        n > 1 and all(n % p for p in islice(base, bisect_right(base, isqrt(n))))
+        for n in int_range
+    )
+
+
+def _prime_mask(int_range):
+    return _interval_mask(int_range, _prime_flags, _prime_element_flags)
+
+
+def _circular_prime_mask(int_range):
+    # Apart from 2 and 5, the digits of a circular prime are 1, 3, 7 or 9.
+    primes = _prime_mask(int_range)
+    return _values_mask(
+        int_range,
+        (p for p in primes if (p < 10 or not set(str(p)) - set('1379')) and is_circular_prime(p))
+    )
+
+
+def _hilbert_mask(int_range):
+    return _interval_mask(int_range, _hilbert_flags, lambda sub: bytes(map(is_hilbert_number, sub)))
+
+
+def _batch_flags(flags):
+    """
+        Returns the flag bytes of the (boolean or integer) array, or list,
+        returned by a batch predicate.
+    """
+    return bytes(map(bool, flags)) if isinstance(flags, list) else flags.astype(bool).tobytes()
+
+
+def _square_mask(int_range, residue=None):
+    if not int_range:
+        return RangeMask(int_range)
+    lo, hi, _ = _span(int_range)
+    roots = range(isqrt(max(lo - 1, 0)) + 1 if lo > 0 else 0, isqrt(max(hi - 1, 0)) + 1)
+    if residue is not None:
+        roots = range(roots.start + (residue - roots.start) % 4, roots.stop, 4)
+    if len(int_range) < len(roots):
+        # A sparse range has fewer elements to test than squares to mark.
+        batch = is_square_batch if residue is None else is_hilbert_square_batch
+        return _interval_mask(int_range, None, lambda sub: _batch_flags(batch(sub)))
+    return _values_mask(int_range, (r * r for r in roots))
+
+
+def _hilbert_squarefree_mask(int_range):
+    # The generator sieves windows of the range of bounded sizes.
+    return _values_mask(int_range, hilbert_squarefree_numbers(int_range))
+
+
+def _polygonal_mask(int_range, sides):
+    if not int_range:
+        return RangeMask(int_range)
+    lo, hi, _ = _span(int_range)
+    span = range(max(lo, 1), max(hi, 1))
+    if len(int_range) < len(polygonal_index_range(sides, int_range=span)):
+        # A sparse range has fewer elements to test than polygonal numbers
+        # to mark.
+        def element_flags(sub):
+            indices = is_polygonal_number_batch(sub, [sides])
+            return _batch_flags([k for k, in indices] if isinstance(indices, list) else indices[:, 0])
+
+        return _interval_mask(int_range, None, element_flags)
+    return _values_mask(int_range, polygonal_numbers(sides, int_range=span))
+
+
+MASK_TYPES = {
+    'prime': _prime_mask,
+    'circular prime': _circular_prime_mask,
+    'hilbert': _hilbert_mask,
+    'hilbert square': lambda int_range: _square_mask(int_range, residue=1),
+    'hilbert squarefree': _hilbert_squarefree_mask,
+    'squarefree hilbert': lambda int_range: _hilbert_mask(int_range) & _hilbert_squarefree_mask(int_range),
+    'square': _square_mask,
+}
+
+_PREDICATE_TYPES = {
+    is_prime: 'prime',
+    is_circular_prime: 'circular prime',
+    is_hilbert_number: 'hilbert',
+    is_hilbert_square: 'hilbert square',
+    is_hilbert_squarefree_number: 'hilbert squarefree',
+    is_squarefree_hilbert_number: 'squarefree hilbert',
+    is_square: 'square',
+}
+
+
+def range_mask(number_type, int_range, sides=None):
+    """
+        Returns the ``RangeMask`` of the numbers of the given type in the
+        given range (of any step), where the type is one of 'prime',
+        'circular prime', 'hilbert', 'hilbert square', 'hilbert squarefree',
+        'squarefree hilbert', 'square' or 'polygonal' (with the given number
+        of sides), or the corresponding predicate (e.g. ``is_prime``), e.g.
+
+            'prime', range(10, 30)       -> 11, 13, 17, 19, 23, 29
+            'polygonal', range(50), 5    -> 1, 5, 12, 22, 35
+
+        The masks are computed in bulk, by sieving the interval spanned by
+        the range (primes, Hilbert squarefree numbers), or by marking the
+        numbers of the type in it (squares, polygonal numbers), rather than
+        by testing the numbers one by one. Any other predicate is evaluated
+        on each number in the range.
+    """
+    if callable(number_type):
+        predicate = getattr(number_type, '__wrapped__', number_type)
+        if predicate is is_polygonal_number and sides is not None:
+            number_type = 'polygonal'
+        elif predicate in _PREDICATE_TYPES:
+            number_type = _PREDICATE_TYPES[predicate]
+        else:
+            return RangeMask.from_predicate(int_range, number_type)
+
+    if number_type == 'polygonal':
+        if sides is None:
+            raise ValueError('The number of sides of the polygonal numbers is required')
+        return _polygonal_mask(int_range, sides)
+    try:
+        return MASK_TYPES[number_type](int_range)
+    except KeyError:
+        raise ValueError('Unknown number type {!r}'.format(number_type)) from None
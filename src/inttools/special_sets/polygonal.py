@@ -1,9 +1,93 @@
-from itertools import (
-    permutations,
-    starmap,
-)
+from collections import deque
+
+from inttools.special_numbers import is_polygonal_number_batch
+
+
+def _hopcroft_karp(adj, n_right):
+    """
+        Returns a maximum matching of a bipartite graph, given by the lists of
+        right vertices (0, 1, ..., n_right - 1) adjacent to each left vertex,
+        as a list of the right vertex matched to each left vertex (or None).
+        Uses the Hopcroft-Karp algorithm, which augments along a maximal set
+        of shortest vertex-disjoint augmenting paths in each phase.
+    """
+    n_left = len(adj)
+    match_left = [None] * n_left
+    match_right = [None] * n_right
+
+    while True:
+        # Layer the free left vertices and those reachable from them by
+        # alternating paths.
+        dist = [None] * n_left
+        queue = deque(u for u in range(n_left) if match_left[u] is None)
+        for u in queue:
+            dist[u] = 0
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in adj[u]:
+                w = match_right[v]
+                if w is None:
+                    found = True
+                elif dist[w] is None:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        if not found:
+            return match_left
+
+        def augment(u):
+            for v in adj[u]:
+                w = match_right[v]
+                if w is None or (dist[w] == dist[u] + 1 and augment(w)):
+                    match_left[u] = v
+                    match_right[v] = u
+                    return True
+            dist[u] = None
+            return False
+
+        for u in range(n_left):
+            if match_left[u] is None:
+                augment(u)
+
+
+def _representative_assignment(int_set, poly_reps, membership):
+    """
+        Returns an assignment of the integers in ``int_set`` to the side
+        counts in ``poly_reps`` as a dict, given a lookup function for the
+        index of an integer as a polygonal number with a side count (or 0),
+        or None if there is no such assignment.
+    """
+    if len(int_set) != len(poly_reps):
+        return None
+
+    adj = [[j for j, m in enumerate(int_set) if membership(m, n)] for n in poly_reps]
+    match = _hopcroft_karp(adj, len(int_set))
+    if None in match:
+        return None
+
+    return {n: int_set[j] for n, j in zip(poly_reps, match)}
+
+
+def polygonal_representative_assignment(int_set, poly_reps):
+    """
+        Returns an assignment of the integers of a P-polygonal set (see
+        ``is_polygonal_representative_set``) to the side counts n in P, as a
+        dict mapping each n to an n-gonal number in the set, or None if the
+        set is not P-polygonal, e.g.
+
+            {2882, 8128, 8281}, [3, 4, 5] -> {3: 8128, 4: 8281, 5: 2882}
+
+        The polygonal membership of each integer for each side count is
+        computed once, as a bipartite graph, and the assignment is found as
+        a perfect matching using the Hopcroft-Karp algorithm.
+    """
+    int_set, poly_reps = list(int_set), list(poly_reps)
+    M = is_polygonal_number_batch(int_set, poly_reps) if int_set and poly_reps else []
+    row = {m: i for i, m in enumerate(int_set)}
+    col = {n: j for j, n in enumerate(poly_reps)}
+
+    return _representative_assignment(int_set, poly_reps, lambda m, n: M[row[m]][col[n]])
 
-from inttools.special_numbers import is_polygonal_number
 
 def is_polygonal_representative_set(int_set, poly_reps):
     """
@@ -13,10 +97,30 @@ def is_polygonal_representative_set(int_set, poly_reps):
         the set {2882, 8128, 8281} is {3,4,5}-polygonal because it
         contains the triangular number 8128, the square number 8281 and
         the pentagonal number 2882.
+
+        See ``polygonal_representative_assignment`` for the method, which
+        is polynomial rather than factorial in the size of the set.
     """
-    return any(
-        (
-            False not in starmap(is_polygonal_number, zip(int_set, poly_rep_perm))
-            for poly_rep_perm in permutations(poly_reps)
-        )
-    )
+    return polygonal_representative_assignment(int_set, poly_reps) is not None
+
+
+def polygonal_representative_assignments(int_sets, poly_reps):
+    """
+        Generates the assignments (or None) of ``polygonal_representative_assignment``
+        for many candidate sets with the same side counts, using a shared
+        membership matrix for all the distinct integers in the sets, which
+        is computed in a single batch.
+    """
+    int_sets = [list(int_set) for int_set in int_sets]
+    poly_reps = list(poly_reps)
+
+    ints = list({m for int_set in int_sets for m in int_set})
+    M = is_polygonal_number_batch(ints, poly_reps) if ints and poly_reps else []
+    row = {m: i for i, m in enumerate(ints)}
+    col = {n: j for j, n in enumerate(poly_reps)}
+
+    def membership(m, n):
+        return M[row[m]][col[n]]
+
+    for int_set in int_sets:
+        yield _representative_assignment(int_set, poly_reps, membership)
@@ -1 +1,3 @@
-from .utils import *
\ No newline at end of file
+from .utils import *
+from .cache import *
+from .profiling import *
@@ -0,0 +1,224 @@
+import sys
+import threading
+
+from collections import (
+    OrderedDict,
+    namedtuple,
+)
+from functools import wraps
+
+
+CacheInfo = namedtuple(
+    'CacheInfo',
+    ['hits', 'misses', 'evictions', 'maxsize', 'currsize', 'maxbytes', 'currbytes', 'enabled']
+)
+
+
+def _sizeof(key, value):
+    """
+    Returns an estimate of the memory used by a cache entry, in bytes: the
+    sizes of the key and the value, and of the items of a tuple or list
+    value.
+    """
+    size = sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+class BoundedCache:
+    """
+    A thread-safe LRU cache bounded by the number of entries (``maxsize``)
+    and/or an estimate of their memory use in bytes (``maxbytes``), either of
+    which can be None for no bound. It supports the dict operations
+    ``cache[key]`` (which counts a hit or a miss), ``cache[key] = value``
+    (which evicts the least recently used entries to stay within the
+    bounds), ``key in cache`` and ``len(cache)``.
+
+    Caches are usually created with ``register_cache``, so that they can be
+    inspected and configured globally.
+    """
+    def __init__(self, name, maxsize=None, maxbytes=None, sizeof=_sizeof):
+        self.name = name
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.enabled = True
+        self._sizeof = sizeof
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __repr__(self):
+        return 'BoundedCache({!r}, maxsize={}, maxbytes={})'.format(self.name, self.maxsize, self.maxbytes)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __getitem__(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        if not self.enabled or self.maxsize == 0:
+            return
+        size = self._sizeof(key, value)
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._sizes.pop(key)
+                del self._data[key]
+            self._data[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._data and (
+            (self.maxsize is not None and len(self._data) > self.maxsize) or
+            (self.maxbytes is not None and self._bytes > self.maxbytes)
+        ):
+            key, _ = self._data.popitem(last=False)
+            self._bytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes all the entries and resets the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def resize(self, maxsize=..., maxbytes=...):
+        """
+        Changes the bounds of the cache (arguments which are not given are
+        left unchanged), evicting entries as necessary.
+        """
+        with self._lock:
+            if maxsize is not ...:
+                self.maxsize = maxsize
+            if maxbytes is not ...:
+                self.maxbytes = maxbytes
+            self._evict()
+
+    def info(self):
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self._data),
+            self.maxbytes, self._bytes, self.enabled
+        )
+
+
+CACHES = {}
+
+
+def register_cache(name, maxsize=None, maxbytes=None, sizeof=_sizeof):
+    """
+    Returns the cache registered under the given name, creating it with the
+    given bounds if there is none. Registered caches can be inspected and
+    configured with ``cache_info``, ``clear_caches`` and ``configure_caches``.
+    """
+    try:
+        return CACHES[name]
+    except KeyError:
+        cache = CACHES[name] = BoundedCache(name, maxsize=maxsize, maxbytes=maxbytes, sizeof=sizeof)
+        return cache
+
+
+def cached(name, maxsize=None, maxbytes=None):
+    """
+    Decorator which memoises a function of hashable positional arguments in
+    a registered cache with the given name and bounds, keyed by the types as
+    well as the values of the arguments, e.g.
+
+        >>> @cached('squares', maxsize=100)
+        ... def square(n):
+        ...     return n * n
+
+        >>> square(3), square.cache.info().hits
+        >>> (9, 0)
+    """
+    def decorator(f):
+        cache = register_cache(name, maxsize=maxsize, maxbytes=maxbytes)
+
+        @wraps(f)
+        def wrapper(*args):
+            # The types are part of the key (except for the common case of
+            # a single int), so that equal arguments of different types, e.g.
+            # 22 and 22.0, do not share the cached values.
+            if len(args) == 1 and type(args[0]) is int:
+                key = args[0]
+            else:
+                key = tuple((type(a), a) for a in args)
+            try:
+                return cache[key]
+            except KeyError:
+                value = cache[key] = f(*args)
+                return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def _selected(name):
+    if name is None:
+        return list(CACHES.values())
+    return [CACHES[name]]
+
+
+def cache_info(name=None):
+    """
+    Returns the statistics of the registered cache with the given name as a
+    ``CacheInfo``, or a dict of the statistics of all of them.
+    """
+    if name is not None:
+        return CACHES[name].info()
+    return {cache.name: cache.info() for cache in CACHES.values()}
+
+
+def clear_caches(name=None):
+    """
+    Clears the registered cache with the given name, or all of them.
+    """
+    for cache in _selected(name):
+        cache.clear()
+
+
+def configure_caches(name=None, maxsize=..., maxbytes=..., enabled=None):
+    """
+    Changes the bounds of the registered cache with the given name, or of all
+    of them, and/or enables or disables them. Arguments which are not given
+    are left unchanged, and None means no bound, e.g.
+
+        >>> configure_caches('prime_factors', maxsize=10 ** 6, maxbytes=2 ** 28)
+
+        >>> configure_caches(enabled=False)
+    """
+    for cache in _selected(name):
+        cache.resize(maxsize=maxsize, maxbytes=maxbytes)
+        if enabled is not None:
+            cache.enabled = enabled
+            if not enabled:
+                cache.clear()
@@ -0,0 +1,339 @@
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from functools import wraps
+
+
+# The code flag of generator functions (``inspect.CO_GENERATOR``), which is
+# tested directly, as importing ``inspect`` would add to the import time of
+# every subpackage.
+_CO_GENERATOR = 0x20
+
+
+class Probe:
+    """
+    The registration of an instrumented function: its name, the function
+    itself, optional callables which derive its engine tier and its
+    inner-loop counters from its result and arguments, and an optional
+    instrumented version of it (see ``profiled``).
+    """
+    __slots__ = ('name', 'function', 'tier', 'counters', 'instrumented')
+
+    def __init__(self, name, function, tier=None, counters=None, instrumented=None):
+        self.name = name
+        self.function = function
+        self.tier = tier
+        self.counters = counters
+        self.instrumented = instrumented
+
+    def __repr__(self):
+        return 'Probe({!r})'.format(self.name)
+
+
+PROBES = {}
+
+_ACTIVE = None
+_ACTIVE_LOCK = threading.Lock()
+_BINDINGS = {}
+
+
+def profiled(name, tier=None, counters=None, instrumented=None):
+    """
+    Decorator which registers a function for profiling under the given name,
+    and returns it unchanged, so that there is no overhead unless profiling
+    is enabled (see ``profiling``), e.g.
+
+        >>> @profiled('is_prime', counters=_is_prime_counters)
+        ... def is_prime(n):
+        ...     ...
+
+    The optional ``tier`` is the name of the engine tier of the calls (e.g.
+    'sieve'), or a callable returning it, and ``counters`` is a callable
+    returning a dict of counts of inner-loop iterations (e.g. trial
+    divisions). Both are called as ``f(result, *args, **kwargs)``, outside
+    the timed section, where for a generator function the result is the
+    number of items generated. For a function memoised with ``cached``,
+    the calls answered from the cache are recorded under the 'cache' tier
+    (without counters), and the others under ``tier`` (or 'compute').
+
+    The optional ``instrumented`` is a version of the (non-generator)
+    function which returns the pair of its result and the dict of its
+    counters, and which is called instead of it while profiling is enabled,
+    for counters which cannot be derived cheaply after the call (e.g. the
+    trial divisions of ``is_prime`` for a composite).
+    """
+    def decorator(f):
+        probe = PROBES[name] = Probe(name, f, tier=tier, counters=counters, instrumented=instrumented)
+        with _ACTIVE_LOCK:
+            # A function defined while profiling is enabled (e.g. in a lazily
+            # imported subpackage) is instrumented straight away.
+            if _ACTIVE is not None:
+                wrapper = _ACTIVE._wrap(probe)
+                _BINDINGS[id(f)] = (f, wrapper)
+                return wrapper
+        return f
+    return decorator
+
+
+class Profile:
+    """
+    The statistics collected while profiling is enabled: for each profiled
+    function, the number of calls and the (inclusive) wall time spent in it
+    in total and per engine tier, and the totals of its inner-loop counters.
+    The statistics can be read with ``snapshot`` (as a nested dict) or
+    ``records`` (as a flat list of metrics, e.g. for a metrics pipeline),
+    or formatted with ``report``.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = {}
+        self.started = time.time()
+        self.stopped = None
+
+    def _record(self, probe, result, args, kwargs, elapsed, hit=False, failed=False, counts=None):
+        tier = None
+        if hit:
+            tier = 'cache'
+        elif failed:
+            tier = 'error'
+        else:
+            tier = probe.tier(result, *args, **kwargs) if callable(probe.tier) else probe.tier
+            if tier is None and hasattr(probe.function, 'cache'):
+                tier = 'compute'
+            if counts is None and probe.counters is not None:
+                counts = probe.counters(result, *args, **kwargs)
+
+        with self._lock:
+            stats = self._calls.setdefault((probe.name, tier), [0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            if counts:
+                totals = self._counters.setdefault(probe.name, {})
+                for key, value in counts.items():
+                    totals[key] = totals.get(key, 0) + value
+
+    def _wrap(self, probe):
+        """
+        Returns the instrumented version of a probe's function, which records
+        its calls in this profile.
+        """
+        f = probe.function
+        cache = getattr(f, 'cache', None)
+        clock = time.perf_counter
+
+        if getattr(getattr(f, '__code__', None), 'co_flags', 0) & _CO_GENERATOR:
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                elapsed, k, failed = 0.0, 0, False
+                t = clock()
+                it = f(*args, **kwargs)
+                elapsed += clock() - t
+                try:
+                    while True:
+                        t = clock()
+                        try:
+                            value = next(it)
+                        except StopIteration:
+                            break
+                        except BaseException:
+                            failed = True
+                            raise
+                        finally:
+                            elapsed += clock() - t
+                        k += 1
+                        yield value
+                finally:
+                    self._record(probe, k, args, kwargs, elapsed, failed=failed)
+            return wrapper
+
+        instrumented = probe.instrumented
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            hits = cache.hits if cache is not None else 0
+            counts = None
+            t = clock()
+            try:
+                if instrumented is not None:
+                    result, counts = instrumented(*args, **kwargs)
+                else:
+                    result = f(*args, **kwargs)
+            except BaseException:
+                self._record(probe, None, args, kwargs, clock() - t, failed=True)
+                raise
+            elapsed = clock() - t
+            self._record(probe, result, args, kwargs, elapsed, hit=cache is not None and cache.hits > hits, counts=counts)
+            return result
+        return wrapper
+
+    def snapshot(self):
+        """
+        Returns the statistics as a dict of the form
+
+            {
+                'started': ..., 'stopped': ..., 'elapsed': ...,
+                'functions': {
+                    'prime_factors': {
+                        'calls': 3, 'time': 0.0021,
+                        'tiers': {'cache': {'calls': 1, 'time': ...}, 'trial_division': {...}},
+                        'counters': {'trial_divisions': 1250}
+                    },
+                    ...
+                }
+            }
+
+        where the times are in seconds, and the tiers are only given for the
+        functions which have them.
+        """
+        with self._lock:
+            functions = {}
+            for (name, tier), (calls, elapsed) in sorted(self._calls.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+                stats = functions.setdefault(name, {'calls': 0, 'time': 0.0, 'tiers': {}, 'counters': {}})
+                stats['calls'] += calls
+                stats['time'] += elapsed
+                if tier is not None:
+                    stats['tiers'][tier] = {'calls': calls, 'time': elapsed}
+            for name, counts in self._counters.items():
+                functions[name]['counters'] = dict(sorted(counts.items()))
+
+        stopped = self.stopped
+        return {
+            'started': self.started,
+            'stopped': stopped,
+            'elapsed': (stopped or time.time()) - self.started,
+            'functions': functions,
+        }
+
+    def records(self):
+        """
+        Returns the statistics as a flat list of dicts with the keys
+        'function', 'tier', 'metric' and 'value', with one record for the
+        calls and the time per function and per tier (where the tier is None
+        for the totals), and one per counter, e.g.
+
+            {'function': 'is_prime', 'tier': None, 'metric': 'trial_divisions', 'value': 4096}
+        """
+        records = []
+        for name, stats in self.snapshot()['functions'].items():
+            for tier, tier_stats in [(None, stats)] + list(stats['tiers'].items()):
+                records.append({'function': name, 'tier': tier, 'metric': 'calls', 'value': tier_stats['calls']})
+                records.append({'function': name, 'tier': tier, 'metric': 'time', 'value': tier_stats['time']})
+            for key, value in stats['counters'].items():
+                records.append({'function': name, 'tier': None, 'metric': key, 'value': value})
+        return records
+
+    def report(self):
+        """
+        Returns the statistics formatted as a table, with the functions in
+        descending order of time.
+        """
+        functions = self.snapshot()['functions']
+        lines = ['{:<40} {:>10} {:>12}  {}'.format('function', 'calls', 'time (ms)', 'counters')]
+        for name, stats in sorted(functions.items(), key=lambda item: -item[1]['time']):
+            counts = ', '.join('{}={}'.format(key, value) for key, value in stats['counters'].items())
+            lines.append('{:<40} {:>10} {:>12.3f}  {}'.format(name, stats['calls'], stats['time'] * 1e3, counts))
+            for tier, tier_stats in stats['tiers'].items():
+                lines.append('{:<40} {:>10} {:>12.3f}'.format('  [{}]'.format(tier), tier_stats['calls'], tier_stats['time'] * 1e3))
+        return '\n'.join(lines)
+
+
+def _rebind(replacements):
+    """
+    Replaces the module-level references to the given objects (a dict of
+    their ids to the replacements) in the loaded ``inttools`` modules (and
+    not in any other modules).
+    """
+    for name, module in list(sys.modules.items()):
+        if name != 'inttools' and not name.startswith('inttools.'):
+            continue
+        namespace = getattr(module, '__dict__', None)
+        if not isinstance(namespace, dict):
+            continue
+        for key, value in list(namespace.items()):
+            replacement = replacements.get(id(value))
+            if replacement is not None and replacement[0] is value:
+                namespace[key] = replacement[1]
+
+
+def is_profiling():
+    """
+    Returns whether profiling is enabled.
+    """
+    return _ACTIVE is not None
+
+
+def enable_profiling():
+    """
+    Enables profiling, and returns the ``Profile`` in which the statistics
+    are collected until ``disable_profiling`` is called.
+
+    The profiled functions are instrumented by rebinding the module-level
+    references to them, in the loaded ``inttools`` modules, to instrumented
+    wrappers, which are unbound again when profiling is disabled. So the
+    functions need not check whether profiling is enabled, and other
+    modules are never modified, but the references outside the package
+    (e.g. from ``from inttools import is_prime``) are not instrumented:
+    call the functions through the package (``inttools.is_prime``) to
+    profile them.
+    """
+    global _ACTIVE
+
+    with _ACTIVE_LOCK:
+        if _ACTIVE is not None:
+            raise RuntimeError('Profiling is already enabled')
+        profile = Profile()
+        for probe in PROBES.values():
+            _BINDINGS[id(probe.function)] = (probe.function, profile._wrap(probe))
+        _rebind(_BINDINGS)
+        _ACTIVE = profile
+        return profile
+
+
+def disable_profiling():
+    """
+    Disables profiling, and returns the ``Profile`` in which the statistics
+    were collected (or None if profiling was not enabled).
+    """
+    global _ACTIVE
+
+    with _ACTIVE_LOCK:
+        profile = _ACTIVE
+        if profile is None:
+            return None
+        _rebind({id(wrapper): (wrapper, f) for f, wrapper in _BINDINGS.values()})
+        _BINDINGS.clear()
+        profile.stopped = time.time()
+        _ACTIVE = None
+        return profile
+
+
+@contextmanager
+def profiling():
+    """
+    Context manager which enables profiling in its body, and yields the
+    ``Profile`` in which the statistics are collected, e.g.
+
+        >>> with profiling() as profile:
+        ...     list(prime_factors(2 ** 40 - 1))
+        ...     is_prime(10 ** 9 + 7)
+
+        >>> profile.snapshot()['functions']['is_prime']
+        >>> {'calls': 1, 'time': 0.0011, 'tiers': {}, 'counters': {'trial_divisions': 15810}}
+    """
+    profile = enable_profiling()
+    try:
+        yield profile
+    finally:
+        disable_profiling()
+
+
+def profile_snapshot():
+    """
+    Returns the snapshot of the statistics of the current profile (see
+    ``Profile.snapshot``), or None if profiling is not enabled.
+    """
+    profile = _ACTIVE
+    return profile.snapshot() if profile is not None else None
@@ -1,3 +1,5 @@
+import math
+
 from functools import reduce
 from math import factorial
 
@@ -8,3 +10,25 @@ def integerise(f):
     returns the same float.
     """
     return int(f) if isinstance(f, float) and f.is_integer() else f
+
+
+def ilog(n, b):
+    """
+    Returns the integer logarithm of a positive integer ``n`` in an integer
+    base ``b > 1``, i.e. the largest integer ``k`` such that ``b^k <= n``,
+    using exact integer arithmetic (the float logarithm is only used as an
+    initial estimate), e.g.
+    ::
+        1000, 10          -> 3
+        999, 10           -> 2
+        10 ** 100 - 1, 10 -> 99
+    """
+    if n < 1 or b < 2:
+        raise ValueError('n must be a positive integer and b an integer greater than 1')
+
+    k = int(math.log(n, b))
+    while b ** k > n:
+        k -= 1
+    while b ** (k + 1) <= n:
+        k += 1
+    return k